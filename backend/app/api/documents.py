@@ -1,34 +1,101 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from app.services.rag_service import RAGService
+from app.services.vector_store import parse_point_id
+from app.services.registry import get_rag_service
 from app.core.config import settings
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
+import json
 import logging
 
 router = APIRouter()
 
-# Initialize RAG service with API key from config
-rag_service = RAGService(openai_api_key=settings.OPENAI_API_KEY)
+# Handlers that call Qdrant or SQLite synchronously are plain def, so FastAPI
+# runs them in its threadpool instead of blocking the event loop
+
+MAX_PAGE_SIZE = 1000
+MAX_DELETE_IDS = 10000
+
+class DeleteDocumentsRequest(BaseModel):
+    ids: List[Union[int, str]] = Field(
+        ..., min_length=1, max_length=MAX_DELETE_IDS, description="Document (point) IDs: UUIDs or unsigned integers"
+    )
+
+    @field_validator("ids")
+    @classmethod
+    def parse_ids(cls, ids: List[Union[int, str]]) -> List[Union[int, str]]:
+        """Normalize each ID to the form Qdrant stores, dropping duplicates"""
+        parsed = []
+        for doc_id in ids:
+            try:
+                parsed.append(parse_point_id(doc_id))
+            except ValueError:
+                raise ValueError(f"Invalid document ID: {doc_id!r}")
+        return list(dict.fromkeys(parsed))
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated field projection, e.g. title,source"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
 
 @router.get("/documents")
-async def get_documents() -> Dict[str, Any]:
-    """Get all documents"""
+def get_documents(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Documents per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated payload fields, e.g. title,source,type"),
+    rag_service: RAGService = Depends(get_rag_service)
+) -> Dict[str, Any]:
+    """Get one page of documents"""
     try:
-        documents = rag_service.get_all_documents()
-        return {
-            "documents": documents if documents is not None else [],
-            "total_documents": len(documents) if documents is not None else 0
-        }
+        documents, next_cursor = rag_service.list_documents(limit, cursor, _parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error retrieving documents: {str(e)}")
         # Return a valid empty response instead of raising HTTPException
         return {
             "documents": [],
+            "next_cursor": None,
             "total_documents": 0,
             "error": f"Error retrieving documents: {str(e)}"
         }
+    return {
+        "documents": documents,
+        "next_cursor": next_cursor,
+        "total_documents": rag_service.vector_store.get_stats().get("total_points", 0)
+    }
+
+@router.get("/documents/export")
+def export_documents(
+    fields: Optional[str] = Query(None, description="Comma-separated payload fields, e.g. title,source,type"),
+    rag_service: RAGService = Depends(get_rag_service)
+) -> StreamingResponse:
+    """Stream every document as newline-delimited JSON"""
+    field_list = _parse_fields(fields)
+    try:
+        # Fetch the first page up front so a bad projection fails with a status code
+        documents = rag_service.iter_documents(field_list)
+        first = next(documents, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        if first is None:
+            return
+        yield json.dumps(first, default=str) + "\n"
+        for document in documents:
+            yield json.dumps(document, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="documents.ndjson"'}
+    )
 
 @router.delete("/documents/{doc_id}")
-async def delete_document(doc_id: str) -> Dict[str, Any]:
+def delete_document(doc_id: str, rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
     """Delete a document"""
     try:
         success = rag_service.delete_document(doc_id)
@@ -46,8 +113,17 @@ async def delete_document(doc_id: str) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
 
+@router.post("/documents/delete")
+def delete_documents(request: DeleteDocumentsRequest, rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
+    """Delete many documents by ID with one Qdrant lookup and one delete"""
+    try:
+        result = rag_service.delete_documents(request.ids)
+        return {"message": f"Deleted {result['deleted']} documents", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting documents: {str(e)}")
+
 @router.delete("/documents")
-async def clear_all_documents() -> Dict[str, Any]:
+def clear_all_documents(rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
     """Clear all documents"""
     try:
         success = rag_service.clear_all_documents()
@@ -64,31 +140,60 @@ async def clear_all_documents() -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing documents: {str(e)}")
 
+@router.get("/sources")
+def list_sources(rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
+    """List uploaded source files with their chunk counts, sizes and ingest timings"""
+    sources = rag_service.list_sources()
+    return {
+        "sources": sources,
+        "total_sources": len(sources)
+    }
+
+@router.delete("/sources/{name:path}")
+def delete_source(name: str, rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
+    """Delete every chunk of an uploaded source file"""
+    try:
+        deleted = rag_service.delete_source(name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting source: {str(e)}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Source not found")
+    return {
+        "message": "Source deleted successfully",
+        "source": name,
+        "chunks_deleted": deleted
+    }
+
 @router.get("/health")
 async def health_check() -> Dict[str, str]:
     """Health check endpoint"""
     return {"status": "healthy"}
 
 @router.get("/stats")
-async def get_stats():
+def get_stats(rag_service: RAGService = Depends(get_rag_service)):
     """Return system statistics for the frontend dashboard (Qdrant version)."""
     try:
         stats = rag_service.vector_store.get_stats()
-        documents = rag_service.get_all_documents()
-        total_documents = len(documents)
+        documents = rag_service.get_document_stats()
+        processor = rag_service.document_processor
         vector_store_info = {
             "collection_name": rag_service.vector_store.collection_name,
             "total_chunks": stats.get("total_points", 0),
             "embedding_model": "all-MiniLM-L6-v2",
             "status": stats.get("status", "unknown"),
+            "embedding_backend": rag_service.vector_store.embedding_backend.name,
         }
         return {
-            "total_documents": total_documents,
+            "total_documents": documents["documents"],
             "total_chunks": stats.get("total_points", 0),
+            "total_bytes": documents["bytes"],
             "vector_store": vector_store_info,
-            "chunk_size": 1000,  # update if dynamic
-            "chunk_overlap": 200, # update if dynamic
-            "database": "Qdrant"
+            "chunk_size": processor.chunk_size,
+            "chunk_overlap": processor.chunk_overlap,
+            "chunking_mode": settings.CHUNKING_MODE,
+            "database": "Qdrant",
+            "caches": rag_service.get_cache_stats(),
+            "query_encoder": rag_service.vector_store.query_encoder.stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Depends
+from app.services.jobs import IngestJobManager
+from app.services.registry import get_job_manager
+from typing import Dict, Any
+
+router = APIRouter()
+
+@router.get("/jobs")
+async def list_jobs(job_manager: IngestJobManager = Depends(get_job_manager)) -> Dict[str, Any]:
+    """List recent ingestion jobs"""
+    jobs = job_manager.list_jobs()
+    return {
+        "jobs": jobs,
+        "total_jobs": len(jobs),
+        "queue": job_manager.stats()
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, job_manager: IngestJobManager = Depends(get_job_manager)) -> Dict[str, Any]:
+    """Get progress, timings and errors for an ingestion job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.model_dump()
@@ -1,21 +1,44 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import Field
 from app.services.rag_service import RAGService
+from app.services.registry import get_rag_service
 from app.core.config import settings
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Optional, Literal
+from app.models.document import SearchFilters, HybridSearch
+import json
 
 router = APIRouter()
 
-# Initialize RAG service with API key from config
-rag_service = RAGService(openai_api_key=settings.OPENAI_API_KEY)
+def _hybrid_search(mode: Optional[str] = None, dense_weight: Optional[float] = None,
+                   sparse_weight: Optional[float] = None) -> Optional[HybridSearch]:
+    """Fusion weights for hybrid retrieval, or None for dense only; unset values come from settings"""
+    if (mode or settings.SEARCH_MODE) != "hybrid":
+        return None
+    return HybridSearch(
+        dense_weight=dense_weight if dense_weight is not None else settings.HYBRID_DENSE_WEIGHT,
+        sparse_weight=sparse_weight if sparse_weight is not None else settings.HYBRID_SPARSE_WEIGHT
+    )
 
-class SearchRequest(BaseModel):
+class SearchRequest(SearchFilters):
     query: str
     top_k: int = 5
     use_rag: bool = True
+    similarity_threshold: Optional[float] = Field(None, description="Minimum similarity score, applied by Qdrant")
+    mode: Optional[Literal["dense", "hybrid"]] = Field(None, description="Retrieval mode (default: SEARCH_MODE)")
+    dense_weight: Optional[float] = Field(None, ge=0, description="Hybrid fusion weight of the dense ranking")
+    sparse_weight: Optional[float] = Field(None, ge=0, description="Hybrid fusion weight of the BM25 ranking")
+    
+    def filters(self) -> Optional[SearchFilters]:
+        """The payload filters in this request, or None if there are none"""
+        filters = SearchFilters(**self.model_dump(include=set(SearchFilters.model_fields)))
+        return filters if filters.model_dump(exclude_none=True) else None
+    
+    def hybrid(self) -> Optional[HybridSearch]:
+        return _hybrid_search(self.mode, self.dense_weight, self.sparse_weight)
 
 @router.post("/search")
-async def search_documents(request: SearchRequest) -> Dict[str, Any]:
+async def search_documents(request: SearchRequest, rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
     """Search for documents"""
     try:
         if not request.query.strip():
@@ -23,7 +46,9 @@ async def search_documents(request: SearchRequest) -> Dict[str, Any]:
         
         if request.use_rag:
             # Use RAG to generate AI response
-            result = rag_service.search_and_generate(request.query, request.top_k)
+            result = await rag_service.asearch_and_generate(
+                request.query, request.top_k, request.filters(), request.similarity_threshold, request.hybrid()
+            )
             
             if result["success"]:
                 return {
@@ -33,7 +58,8 @@ async def search_documents(request: SearchRequest) -> Dict[str, Any]:
                     "sources": result["search_results"],
                     "total_results": len(result["search_results"]),
                     "confidence_score": 0.9,  # Placeholder confidence score
-                    "suggested_queries": []  # Placeholder for suggestions
+                    "suggested_queries": [],  # Placeholder for suggestions
+                    "cached_answer": result["cached"]
                 }
             else:
                 # Return a valid empty response instead of raising HTTPException
@@ -48,7 +74,9 @@ async def search_documents(request: SearchRequest) -> Dict[str, Any]:
                 }
         else:
             # Regular search without AI generation
-            results = rag_service.search_documents(request.query, request.top_k)
+            results = await rag_service.asearch_documents(
+                request.query, request.top_k, request.filters(), request.similarity_threshold, request.hybrid()
+            )
             return {
                 "query": request.query,
                 "response_type": "search",
@@ -60,14 +88,41 @@ async def search_documents(request: SearchRequest) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching documents: {str(e)}")
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/search/stream")
+async def search_stream(request: SearchRequest, rag_service: RAGService = Depends(get_rag_service)) -> StreamingResponse:
+    """Search, then stream the AI answer as Server-Sent Events
+    
+    Events: 'sources' (retrieved chunks, sent before generation starts),
+    'token' (answer text deltas), then 'done' (timings including
+    time_to_first_token_ms) or 'error'.
+    """
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    
+    async def events() -> AsyncIterator[str]:
+        async for event, data in rag_service.astream_search_and_generate(
+            request.query, request.top_k, request.filters(), request.similarity_threshold, request.hybrid()
+        ):
+            yield _sse(event, data)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/search-and-generate")
-async def search_and_generate(query: str, top_k: int = 5) -> Dict[str, Any]:
+async def search_and_generate(query: str, top_k: int = 5, rag_service: RAGService = Depends(get_rag_service)) -> Dict[str, Any]:
     """Search for documents and generate AI response"""
     try:
         if not query.strip():
             raise HTTPException(status_code=400, detail="Query cannot be empty")
         
-        result = rag_service.search_and_generate(query, top_k)
+        result = await rag_service.asearch_and_generate(query, top_k, hybrid=_hybrid_search())
         
         if result["success"]:
             return {
@@ -75,7 +130,8 @@ async def search_and_generate(query: str, top_k: int = 5) -> Dict[str, Any]:
                 "ai_response": result["ai_response"],
                 "search_results": result["search_results"],
                 "sources": result["sources"],
-                "context_used": result["context_used"]
+                "context_used": result["context_used"],
+                "cached_answer": result["cached"]
             }
         else:
             raise HTTPException(status_code=500, detail=result["message"])
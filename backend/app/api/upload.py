@@ -1,19 +1,59 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.rag_service import RAGService
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from app.services.jobs import IngestJobManager, JobQueueFullError
+from app.services.registry import get_job_manager
 from app.core.config import settings
 import os
 import tempfile
-import asyncio
-from typing import Dict, Any
+import hashlib
+import aiofiles
+from typing import Dict, Any, Optional, Tuple
 
 router = APIRouter()
 
-# Initialize RAG service with API key from config
-rag_service = RAGService(openai_api_key=settings.OPENAI_API_KEY)
+# Bytes read from the request per iteration
+UPLOAD_READ_SIZE = 1024 * 1024  # 1MB
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
-    """Upload and process a document with improved error handling and timeout management"""
+async def _save_upload(file: UploadFile, suffix: str) -> Tuple[str, int, Optional[str]]:
+    """Write an upload to a temp file as it arrives, enforcing the size limit
+    
+    Returns the temp file path, the size in bytes and the SHA-256 of the
+    content (None when UPLOAD_HASH_CONTENT is disabled).
+    """
+    fd, temp_file_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    
+    file_size = 0
+    hasher = hashlib.sha256() if settings.UPLOAD_HASH_CONTENT else None
+    try:
+        async with aiofiles.open(temp_file_path, 'wb') as out_file:
+            while chunk := await file.read(UPLOAD_READ_SIZE):
+                file_size += len(chunk)
+                
+                # Stop as soon as the limit is crossed
+                if file_size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size allowed: {settings.MAX_FILE_SIZE / (1024*1024):.1f}MB"
+                    )
+                
+                if hasher is not None:
+                    hasher.update(chunk)
+                await out_file.write(chunk)
+    except BaseException:
+        os.unlink(temp_file_path)
+        raise
+    
+    return temp_file_path, file_size, hasher.hexdigest() if hasher is not None else None
+
+@router.post("/upload", status_code=202)
+async def upload_file(file: UploadFile = File(...), replace: bool = Form(False),
+                      job_manager: IngestJobManager = Depends(get_job_manager)) -> Dict[str, Any]:
+    """Upload a document and queue it for background processing
+    
+    Returns a job ID right away; poll /api/jobs/{job_id} for progress.
+    Re-uploading a file only re-embeds changed chunks unless replace is set,
+    which deletes the stored chunks and re-indexes all of them.
+    """
     try:
         # Validate file type
         allowed_extensions = {'.pdf', '.csv', '.txt'}
@@ -25,71 +65,36 @@ async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
                 detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
             )
         
-        # Check file size
-        file_size = 0
-        content = b""
+        # Determine file type
+        file_type = file_extension[1:]  # Remove the dot
         
-        # Read file content in chunks to avoid memory issues
-        chunk_size = 1024 * 1024  # 1MB chunks
-        while chunk := await file.read(chunk_size):
-            content += chunk
-            file_size += len(chunk)
-            
-            # Check if file is too large
-            if file_size > settings.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File too large. Maximum size allowed: {settings.MAX_FILE_SIZE / (1024*1024):.1f}MB"
-                )
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream the upload to a temporary file (removed by the ingestion job when it finishes)
+        temp_file_path, file_size, content_hash = await _save_upload(file, file_extension)
         
         try:
-            # Determine file type
-            file_type = file_extension[1:]  # Remove the dot
-            
-            # Process the file with timeout handling for large files
-            file_size_mb = file_size / (1024 * 1024)
-            
-            # Set timeout based on file size (longer for larger files)
-            if file_size_mb > 5:
-                timeout_seconds = 600  # 10 minutes for files > 5MB
-            elif file_size_mb > 2:
-                timeout_seconds = 450  # 7.5 minutes for files > 2MB
-            else:
-                timeout_seconds = 300  # 5 minutes for smaller files
-            
-            # Process file with timeout
-            try:
-                result = await asyncio.wait_for(
-                    asyncio.to_thread(rag_service.upload_document, temp_file_path, file_type),
-                    timeout=timeout_seconds
-                )
-            except asyncio.TimeoutError:
-                raise HTTPException(
-                    status_code=408,
-                    detail=f"Processing timeout. The file ({file_size_mb:.1f}MB) is too large or complex. Try splitting it into smaller files or contact support."
-                )
-            
-            if result["success"]:
-                return {
-                    "message": result["message"],
-                    "filename": file.filename,
-                    "chunks_processed": result["chunks_processed"],
-                    "file_type": result["file_type"],
-                    "file_size_mb": round(file_size_mb, 2),
-                    "processing_time_seconds": timeout_seconds
-                }
-            else:
-                raise HTTPException(status_code=500, detail=result["message"])
-                
-        finally:
-            # Clean up temporary file
+            job = job_manager.submit(
+                temp_file_path, file_type, file.filename, file_size, content_hash=content_hash, replace=replace
+            )
+        except JobQueueFullError as e:
+            # Already removed if shutdown failed the job after it was queued
             if os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception:
+            os.unlink(temp_file_path)
+            raise
+        
+        return {
+            "message": "File accepted for processing",
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"{settings.API_V1_STR}/jobs/{job.id}",
+            "filename": file.filename,
+            "file_type": file_type,
+            "file_size_mb": round(file_size / (1024 * 1024), 2),
+            "content_hash": content_hash,
+            "replace": replace
+        }
                 
     except HTTPException:
         raise
@@ -11,27 +11,73 @@ class Settings(BaseSettings):
     
     # Database Configuration
     QDRANT_DB_PATH: str = "./data/qdrant"
+    QDRANT_HOST: str = "host.docker.internal"  # Qdrant server (Docker on the host by default)
+    QDRANT_PORT: int = 6333
+    COLLECTION_PROFILE: str = "default"  # "default", "high_recall", "memory" (int8) or "compact" (binary); see collection_profiles.py
+    COLLECTION_PROFILE_OVERRIDES: dict = {}  # Per-setting overrides as JSON, e.g. {"hnsw_ef": 200}
     
     # File Upload Configuration
     UPLOAD_DIR: str = "./data/uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS: set = {".txt", ".pdf", ".csv"}
+    UPLOAD_HASH_CONTENT: bool = True  # Compute a SHA-256 of each upload while streaming it to disk
+    
+    # Ingestion Job Configuration
+    INGEST_WORKERS: int = 1  # Concurrent ingestion jobs; keep low so uploads don't starve search
+    INGEST_MAX_PENDING: int = 8  # Jobs allowed to wait for a worker before uploads are rejected
+    INGEST_JOB_HISTORY: int = 100  # Finished jobs kept for status lookups
     
     # Model Configuration
     MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # "sentence-transformers" (PyTorch), "onnx" or "onnx-int8"
+    ONNX_MODEL_DIR: str = "./data/onnx/all-MiniLM-L6-v2"  # Output of scripts/export_onnx.py
+    ONNX_THREADS: int = 0  # onnxruntime intra-op threads (0 = runtime default)
     CHUNK_SIZE: int = 2000  # Increased for better handling of large files
     CHUNK_OVERLAP: int = 400  # Increased overlap
+    CHUNKING_MODE: str = "chars"  # "chars" sizes chunks by CHUNK_SIZE characters, "tokens" by the model's tokenizer
+    CHUNK_SIZE_TOKENS: Optional[int] = None  # Token mode chunk size; defaults to the model's max sequence length
+    CHUNK_OVERLAP_TOKENS: int = 32  # Token mode overlap
+    REPORT_TRUNCATION: bool = False  # Re-tokenize new chunks at ingest to count tokens cut by the model window
     MAX_CSV_ROWS: int = 10000  # Limit CSV processing to prevent memory issues
+    PDF_EXTRACT_WORKERS: int = 1  # Processes used for PDF text extraction (1 = serial)
+    PDF_PARALLEL_MIN_PAGES: int = 64  # Smaller PDFs are always extracted serially
+    EMBEDDING_BATCH_SIZE: int = 64  # Chunks encoded per forward pass
+    QUERY_BATCH_WINDOW_MS: float = 2.0  # How long the query encoder waits to batch concurrent searches
+    QUERY_BATCH_MAX_SIZE: int = 32  # Queries encoded per batched forward pass
+    QUERY_ENCODE_TIMEOUT_SECONDS: float = 30.0  # Blocking searches give up waiting for the query encoder after this
+    UPSERT_BATCH_SIZE: int = 100  # Points sent per Qdrant upsert request
+    INGEST_BATCH_SIZE: int = 256  # Chunks per batch passed between ingest pipeline stages
+    INGEST_QUEUE_SIZE: int = 4  # Batches buffered between stages before the upstream stage blocks
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = "sk-your_actual_openai_api_key_here"  # Replace with your actual API key
+    OPENAI_BASE_URL: Optional[str] = None  # OpenAI-compatible endpoint, e.g. http://localhost:8001/v1 for scripts/fake_openai_server.py
     OPENAI_MODEL: str = "gpt-3.5-turbo"
     MAX_TOKENS: int = 500
     
     # Search Configuration
     TOP_K_RESULTS: int = 5
     SIMILARITY_THRESHOLD: float = 0.7
+    SEARCH_MODE: str = "dense"  # "dense", or "hybrid" to fuse dense and BM25 sparse results by default
+    HYBRID_DENSE_WEIGHT: float = 1.0  # Reciprocal rank fusion weight of the dense ranking
+    HYBRID_SPARSE_WEIGHT: float = 1.0  # Reciprocal rank fusion weight of the BM25 ranking
+    HYBRID_CANDIDATES: int = 4  # Each retriever fetches top_k * this many candidates for fusion
+    RRF_K: int = 60  # Rank offset in reciprocal rank fusion; higher flattens the rank weights
+    
+    # Cache Configuration
+    QUERY_CACHE_SIZE: int = 1024  # Cached query embeddings
+    QUERY_CACHE_TTL_SECONDS: int = 3600
+    RESULT_CACHE_ENABLED: bool = False  # Cache search results until the collection changes
+    RESULT_CACHE_SIZE: int = 512
+    RESULT_CACHE_TTL_SECONDS: int = 300
+    EMBEDDING_CACHE_ENABLED: bool = True  # Reuse chunk embeddings across re-uploads
+    EMBEDDING_CACHE_PATH: str = "./data/embedding_cache.db"
+    DOCUMENT_REGISTRY_PATH: str = "./data/document_registry.db"  # Per-source chunk counts, sizes and ingest timings
+    ANSWER_CACHE_ENABLED: bool = False  # Reuse generated answers for paraphrased questions over the same chunks
+    ANSWER_CACHE_SIZE: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+    ANSWER_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity between the new and cached question
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
@@ -1,8 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
-from app.api import documents, search, upload
+from app.api import documents, search, upload, jobs
+from app.services.registry import init_services, ashutdown_services, get_startup_metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the embedding model and open clients once per worker"""
+    await asyncio.to_thread(init_services)
+    yield
+    await ashutdown_services()
 
 # Create FastAPI app
 app = FastAPI(
@@ -10,7 +20,8 @@ app = FastAPI(
     description="A comprehensive RAG system for searching through knowledge base articles and support cases",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -26,6 +37,7 @@ app.add_middleware(
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(search.router, prefix="/api", tags=["search"])
 app.include_router(documents.router, prefix="/api", tags=["documents"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 # Ensure upload directory exists
 os.makedirs("./data/uploads", exist_ok=True)
@@ -43,7 +55,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "message": "API is running"}
+    return {"status": "healthy", "message": "API is running", "startup": get_startup_metrics()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -77,6 +77,19 @@ class SearchQuery(BaseModel):
     categories: Optional[List[str]] = Field(None, description="Filter by categories")
     similarity_threshold: float = Field(default=0.7, description="Minimum similarity score")
 
+class SearchFilters(BaseModel):
+    """Payload filters applied server-side by Qdrant"""
+    document_types: Optional[List[DocumentType]] = Field(None, description="Only chunks of these document types")
+    sources: Optional[List[str]] = Field(None, description="Only chunks from these source files")
+    pages: Optional[List[int]] = Field(None, description="Only PDF chunks from these pages (1-based)")
+    ingested_after: Optional[datetime] = Field(None, description="Only chunks ingested at or after this time")
+    ingested_before: Optional[datetime] = Field(None, description="Only chunks ingested before this time")
+
+class HybridSearch(BaseModel):
+    """Dense and BM25 sparse retrieval merged by reciprocal rank fusion"""
+    dense_weight: float = Field(1.0, ge=0, description="Fusion weight of the dense (embedding) ranking")
+    sparse_weight: float = Field(1.0, ge=0, description="Fusion weight of the sparse (BM25) ranking")
+
 class RAGResponse(BaseModel):
     """Model for RAG responses"""
     query: str = Field(..., description="Original query")
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+from app.models.document import DocumentStatus
+
+class JobStage(BaseModel):
+    """Progress of one ingestion stage (parse, embed, upsert)"""
+    status: DocumentStatus = Field(default=DocumentStatus.PENDING, description="Stage status")
+    items_done: int = Field(default=0, description="Chunks finished by this stage")
+    items_total: Optional[int] = Field(None, description="Chunks expected, when known")
+    seconds: Optional[float] = Field(None, description="Wall-clock time spent in this stage")
+
+class IngestJob(BaseModel):
+    """Background ingestion job for an uploaded file"""
+    id: str = Field(..., description="Job ID")
+    filename: str = Field(..., description="Original file name")
+    file_type: str = Field(..., description="File type (pdf, csv, txt)")
+    file_size: int = Field(..., description="File size in bytes")
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the uploaded file")
+    replace: bool = Field(default=False, description="Re-index every chunk instead of syncing changes")
+    status: DocumentStatus = Field(default=DocumentStatus.PENDING, description="Job status")
+    stages: Dict[str, JobStage] = Field(default_factory=dict, description="Per-stage progress")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Submission timestamp")
+    started_at: Optional[datetime] = Field(None, description="Time a worker picked the job up")
+    finished_at: Optional[datetime] = Field(None, description="Completion timestamp")
+    queue_seconds: Optional[float] = Field(None, description="Time spent waiting for a worker")
+    processing_seconds: Optional[float] = Field(None, description="Actual processing time")
+    result: Optional[Dict[str, Any]] = Field(None, description="Ingestion result")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
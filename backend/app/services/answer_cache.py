@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """In-process cache of generated answers keyed by query meaning
+
+    Entries hold the query embedding, the IDs of the chunks the answer was
+    generated from and the answer itself. A lookup hits when a stored query is
+    at least `threshold` cosine-similar to the new one and retrieval for the
+    new query returned the same chunks. Chunk point IDs are derived from chunk
+    content, so an edited, replaced or deleted document never matches the
+    stored sources and its answers are not served again.
+
+    Embeddings live in one preallocated matrix so a lookup is a single
+    matrix-vector product. Entries are evicted least recently used first once
+    maxsize is reached, and expire after ttl_seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, threshold: float, dimension: int):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+
+        self._vectors = np.zeros((max(maxsize, 0), dimension), dtype=np.float32)
+        self._expires_at = np.full(max(maxsize, 0), -np.inf)
+        # slot -> (source IDs, answer), in LRU order
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._free = list(range(maxsize - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, embedding: np.ndarray, source_ids: Iterable[Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached answer for a similar query over the same sources"""
+        sources = frozenset(str(source_id) for source_id in source_ids)
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            self._expire()
+            scores = self._vectors @ self._unit(embedding)
+            # Empty slots can never clear the threshold
+            scores[self._expires_at == -np.inf] = -np.inf
+            candidates = np.flatnonzero(scores >= self.threshold)
+
+            saw_stale = False
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                cached_sources, answer = self._entries[int(slot)]
+                if cached_sources == sources:
+                    self._entries.move_to_end(int(slot))
+                    self.hits += 1
+                    return {**answer, 'similarity': round(float(scores[slot]), 4)}
+                saw_stale = True
+
+            if saw_stale:
+                self.stale += 1
+            self.misses += 1
+            return None
+
+    def set(self, embedding: np.ndarray, source_ids: Iterable[Any], answer: Dict[str, Any]) -> None:
+        """Store an answer, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+
+        sources: FrozenSet[str] = frozenset(str(source_id) for source_id in source_ids)
+        with self._lock:
+            self._expire()
+            if not self._free:
+                slot, _ = self._entries.popitem(last=False)
+                self._free.append(slot)
+                self.evictions += 1
+
+            slot = self._free.pop()
+            self._vectors[slot] = self._unit(embedding)
+            self._expires_at[slot] = time.monotonic() + self.ttl_seconds
+            self._entries[slot] = (sources, answer)
+
+    def _expire(self) -> None:
+        """Free expired slots (caller holds the lock)"""
+        expired = np.flatnonzero((self._expires_at < time.monotonic()) & (self._expires_at > -np.inf))
+        for slot in expired:
+            slot = int(slot)
+            del self._entries[slot]
+            self._free.append(slot)
+            self._expires_at[slot] = -np.inf
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._expires_at[:] = -np.inf
+            self._free = list(range(self.maxsize - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring; stale counts misses whose similar query had other sources"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl_seconds,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,150 @@
+import logging
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+from qdrant_client.models import (
+    BinaryQuantization, BinaryQuantizationConfig, Distance, HnswConfigDiff, PayloadSchemaType,
+    QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams,
+    SparseIndexParams, SparseVectorParams, VectorParams
+)
+
+from app.services.hybrid_search import SPARSE_VECTOR_NAME
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionProfile(BaseModel):
+    """Index, quantization and storage settings for the Qdrant collection"""
+    name: str = Field(..., description="Profile name")
+    hnsw_m: int = Field(16, description="HNSW graph degree; higher improves recall and costs memory")
+    hnsw_ef_construct: int = Field(100, description="HNSW build-time candidate list size")
+    hnsw_ef: Optional[int] = Field(None, description="Search-time candidate list size (None = Qdrant default)")
+    quantization: Optional[str] = Field(None, description="None, 'scalar' (int8) or 'binary'")
+    quantization_always_ram: bool = Field(True, description="Keep quantized vectors in RAM when originals are on disk")
+    rescore: bool = Field(True, description="Re-rank quantized candidates with the original vectors")
+    oversampling: Optional[float] = Field(None, description="Fetch limit * oversampling quantized candidates before rescoring")
+    on_disk_vectors: bool = Field(False, description="Store original vectors on disk (memmap)")
+    on_disk_payload: bool = Field(False, description="Store payloads on disk")
+
+    def vectors_config(self, dimension: int) -> VectorParams:
+        return VectorParams(size=dimension, distance=Distance.COSINE, on_disk=self.on_disk_vectors)
+
+    def sparse_vectors_config(self) -> Dict[str, SparseVectorParams]:
+        """The BM25 vector used by hybrid search; its index follows on_disk_vectors"""
+        return {SPARSE_VECTOR_NAME: SparseVectorParams(index=SparseIndexParams(on_disk=self.on_disk_vectors))}
+
+    def hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization is None:
+            return None
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=self.quantization_always_ram)
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=self.quantization_always_ram))
+        raise ValueError(f"Unknown quantization: {self.quantization} (expected 'scalar' or 'binary')")
+
+    def search_params(self) -> Optional[SearchParams]:
+        """Per-request search parameters, or None to use the collection defaults"""
+        quantization = None
+        if self.quantization is not None:
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if self.hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+
+# Built-in profiles, from most memory to least
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # Qdrant defaults: full-precision vectors and payloads in RAM
+    "default": {},
+    # Denser graph and wider search for the best recall
+    "high_recall": {"hnsw_m": 32, "hnsw_ef_construct": 256, "hnsw_ef": 256},
+    # int8 vectors in RAM (~4x smaller), originals on disk for rescoring
+    "memory": {
+        "quantization": "scalar", "oversampling": 2.0, "hnsw_ef": 128,
+        "on_disk_vectors": True, "on_disk_payload": True
+    },
+    # 1-bit vectors in RAM (~32x smaller); recall depends heavily on rescoring at 384 dimensions
+    "compact": {
+        "quantization": "binary", "oversampling": 3.0, "hnsw_ef": 128,
+        "on_disk_vectors": True, "on_disk_payload": True
+    },
+}
+
+
+# Payload fields filtered on at search time; ingested_at is epoch seconds
+PAYLOAD_INDEXES = {
+    "source": PayloadSchemaType.KEYWORD,
+    "type": PayloadSchemaType.KEYWORD,
+    "ingested_at": PayloadSchemaType.INTEGER,
+    "page": PayloadSchemaType.INTEGER,
+}
+
+
+def get_profile(name: str, overrides: Optional[Dict[str, Any]] = None) -> CollectionProfile:
+    """Look up a built-in profile, optionally overriding individual settings"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile: {name} (expected one of {', '.join(PROFILES)})")
+    profile = CollectionProfile(name=name, **{**PROFILES[name], **(overrides or {})})
+    profile.quantization_config()  # validate
+    return profile
+
+
+def create_collection(client, collection_name: str, dimension: int, profile: CollectionProfile,
+                      sparse: bool = False) -> None:
+    """Create a collection configured by profile, with a BM25 sparse vector if sparse is set"""
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=profile.vectors_config(dimension),
+        sparse_vectors_config=profile.sparse_vectors_config() if sparse else None,
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config(),
+        on_disk_payload=profile.on_disk_payload
+    )
+    ensure_payload_indexes(client, collection_name)
+    logger.info("Created collection %s with profile %s", collection_name, profile.name)
+
+
+def ensure_payload_indexes(client, collection_name: str) -> None:
+    """Create any missing payload indexes used by search filters"""
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name not in existing:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema,
+                wait=True
+            )
+
+
+def has_sparse_vectors(collection_info) -> bool:
+    """Whether a collection was created with the hybrid search sparse vector"""
+    return SPARSE_VECTOR_NAME in (collection_info.config.params.sparse_vectors or {})
+
+
+def profile_mismatches(collection_info, profile: CollectionProfile) -> Dict[str, tuple]:
+    """Settings where an existing collection differs from profile, as (current, wanted)"""
+    config = collection_info.config
+    vectors = config.params.vectors
+    quantization = config.quantization_config
+    current = {
+        "hnsw_m": config.hnsw_config.m,
+        "hnsw_ef_construct": config.hnsw_config.ef_construct,
+        "quantization": (
+            "scalar" if getattr(quantization, "scalar", None) is not None
+            else "binary" if getattr(quantization, "binary", None) is not None
+            else None
+        ),
+        "on_disk_vectors": bool(getattr(vectors, "on_disk", False)),
+        "on_disk_payload": bool(config.params.on_disk_payload),
+    }
+    return {
+        key: (value, getattr(profile, key))
+        for key, value in current.items()
+        if value != getattr(profile, key)
+    }
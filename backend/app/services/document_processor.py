@@ -1,261 +1,306 @@
 import os
+import numpy as np
 import pandas as pd
 import PyPDF2
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import multiprocessing
 import uuid
 from datetime import datetime
 import re
 
 from app.models.document import Document, DocumentCreate, DocumentType, DocumentStatus, DocumentChunk
 from app.core.config import settings
+from app.services.text_splitter import TextSplitter
+
+# CSV rows combined into one chunk document, by file size
+CSV_ROWS_PER_CHUNK_SMALL = 20
+CSV_ROWS_PER_CHUNK_LARGE = 50
+# Rows read per pandas batch for large CSV files
+CSV_READ_BATCH_ROWS = 1000
+
+# Smallest page slice handed to a PDF extraction worker
+PDF_MIN_PAGES_PER_TASK = 4
+
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text from pages [start, end) of a PDF (runs in a worker process)"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(page_num, pdf_reader.pages[page_num].extract_text()) for page_num in range(start, end)]
 
 class DocumentProcessor:
     """Service for processing different document types"""
     
-    def __init__(self):
-        self.chunk_size = settings.CHUNK_SIZE
-        self.chunk_overlap = settings.CHUNK_OVERLAP
+    def __init__(self, tokenizer: Optional[Any] = None, chunk_size: Optional[int] = None,
+                 chunk_overlap: Optional[int] = None):
+        """tokenizer switches text splitting from characters to tokens (see TextSplitter)
+        
+        chunk_size and chunk_overlap default to CHUNK_SIZE and CHUNK_OVERLAP and
+        are counted in tokens when a tokenizer is given.
+        """
+        self.chunk_size = chunk_size or settings.CHUNK_SIZE
+        self.chunk_overlap = chunk_overlap if chunk_overlap is not None else settings.CHUNK_OVERLAP
+        self.splitter = TextSplitter(self.chunk_size, self.chunk_overlap, tokenizer=tokenizer)
+        self.pdf_workers = settings.PDF_EXTRACT_WORKERS
+    
+    def process_file(self, file_path: str, file_type: str, source_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Process a file and return document chunks
+        
+        source_name overrides the file name recorded as each chunk's source,
+        e.g. the original upload name when processing a temp file.
+        """
+        return list(self.iter_file(file_path, file_type, source_name))
     
-    def process_file(self, file_path: str, file_type: str) -> List[Dict[str, Any]]:
-        """Process a file and return document chunks"""
+    def iter_file(self, file_path: str, file_type: str, source_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield document chunks as they are produced
+        
+        Lets ingestion embed and upsert early chunks while the rest of the
+        file is still being parsed, without holding every chunk in memory.
+        """
+        source = source_name or os.path.basename(file_path)
         try:
             if file_type.lower() == 'pdf':
-                return self._process_pdf(file_path)
+                yield from self._iter_pdf(file_path, source)
             elif file_type.lower() == 'csv':
-                return self._process_csv(file_path)
+                yield from self._iter_csv(file_path, source)
             elif file_type.lower() == 'txt':
-                return self._process_txt(file_path)
+                yield from self._iter_txt(file_path, source)
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
         except Exception as e:
             raise Exception(f"Error processing file {file_path}: {str(e)}")
     
-    def _process_pdf(self, file_path: str) -> List[Dict[str, Any]]:
+    def _process_pdf(self, file_path: str, source: str) -> List[Dict[str, Any]]:
         """Process PDF file"""
-        documents = []
-        
+        return list(self._iter_pdf(file_path, source))
+    
+    def _iter_pdf(self, file_path: str, source: str) -> Iterator[Dict[str, Any]]:
+        """Yield PDF chunks page by page"""
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            
+            if self.pdf_workers > 1 and page_count >= settings.PDF_PARALLEL_MIN_PAGES:
+                pages = self._extract_pages_parallel(file_path, page_count)
+            else:
+                pages = ((page_num, page.extract_text()) for page_num, page in enumerate(pdf_reader.pages))
             
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
+            for page_num, text in pages:
                 if text.strip():
                     # Split text into chunks
-                    chunks = self._split_text(text)
-                    
-                    for chunk_idx, chunk in enumerate(chunks):
-                        documents.append({
+                    for chunk_idx, chunk in enumerate(self.splitter.split(text)):
+                        yield {
                             'content': chunk,
-                            'source': os.path.basename(file_path),
+                            'source': source,
                             'type': 'pdf',
                             'title': f"Page {page_num + 1} - Chunk {chunk_idx + 1}",
                             'page': page_num + 1,
                             'chunk': chunk_idx + 1
-                        })
+                        }
+    
+    def _extract_pages_parallel(self, file_path: str, page_count: int) -> Iterator[Tuple[int, str]]:
+        """Extract page text in worker processes, yielding pages in order
+        
+        The page range is split into more slices than workers so early pages
+        reach the embedder while later ones are still being extracted.
+        """
+        pages_per_task = max(PDF_MIN_PAGES_PER_TASK, -(-page_count // (self.pdf_workers * 4)))
+        starts = list(range(0, page_count, pages_per_task))
+        ends = [min(start + pages_per_task, page_count) for start in starts]
         
-        return documents
+        # spawn avoids forking a process that holds model and client threads
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.pdf_workers, len(starts)),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            for page_slice in executor.map(_extract_pdf_pages, repeat(file_path), starts, ends):
+                yield from page_slice
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    def _process_csv(self, file_path: str) -> List[Dict[str, Any]]:
+    def _process_csv(self, file_path: str, source: str) -> List[Dict[str, Any]]:
         """Process CSV file with improved memory handling and optimized chunking"""
-        documents = []
-        
+        return list(self._iter_csv(file_path, source))
+    
+    def _iter_csv(self, file_path: str, source: str) -> Iterator[Dict[str, Any]]:
+        """Yield CSV chunks, falling back to plain lines if pandas cannot parse the file"""
+        produced = 0
         try:
-            # Get file size to determine processing strategy
-            file_size = os.path.getsize(file_path)
-            file_size_mb = file_size / (1024 * 1024)
-            
-            # For large files (>2MB), use more aggressive chunking
-            if file_size_mb > 2:
-                # Read CSV in chunks to avoid memory issues
-                chunk_size = 1000  # Process 1000 rows at a time
-                total_rows = 0
-                current_chunk_content = []
-                chunk_counter = 1
-                
-                for chunk in pd.read_csv(file_path, chunksize=chunk_size):
-                    for idx, row in chunk.iterrows():
-                        # Limit total rows to prevent memory issues
-                        if total_rows >= settings.MAX_CSV_ROWS:
-                            break
-                            
-                        # Combine all columns into a single text
-                        row_text = " | ".join([f"{col}: {str(val)}" for col, val in row.items() if pd.notna(val)])
-                        
-                        if row_text.strip():
-                            current_chunk_content.append(row_text)
-                            
-                            # Create a chunk every 50 rows for large files to reduce total chunks
-                            if len(current_chunk_content) >= 50:
-                                combined_text = "\n".join(current_chunk_content)
-                                documents.append({
-                                    'content': combined_text,
-                                    'source': os.path.basename(file_path),
-                                    'type': 'csv',
-                                    'title': f"Chunk {chunk_counter} (Rows {total_rows - len(current_chunk_content) + 1}-{total_rows})",
-                                    'chunk': chunk_counter,
-                                    'rows': f"{total_rows - len(current_chunk_content) + 1}-{total_rows}"
-                                })
-                                current_chunk_content = []
-                                chunk_counter += 1
-                        
-                        total_rows += 1
-                    
-                    if total_rows >= settings.MAX_CSV_ROWS:
-                        break
-                
-                # Add remaining content as final chunk
-                if current_chunk_content:
-                    combined_text = "\n".join(current_chunk_content)
-                    documents.append({
-                        'content': combined_text,
-                        'source': os.path.basename(file_path),
-                        'type': 'csv',
-                        'title': f"Chunk {chunk_counter} (Rows {total_rows - len(current_chunk_content) + 1}-{total_rows})",
-                        'chunk': chunk_counter,
-                        'rows': f"{total_rows - len(current_chunk_content) + 1}-{total_rows}"
-                    })
-                        
-            else:
-                # For smaller files, read normally but still optimize chunking
-                df = pd.read_csv(file_path)
-                
-                # Process each row (limit to MAX_CSV_ROWS)
-                current_chunk_content = []
-                chunk_counter = 1
-                
-                for idx, row in df.iterrows():
-                    if idx >= settings.MAX_CSV_ROWS:
-                        break
-                        
-                    # Combine all columns into a single text
-                    row_text = " | ".join([f"{col}: {str(val)}" for col, val in row.items() if pd.notna(val)])
-                    
-                    if row_text.strip():
-                        current_chunk_content.append(row_text)
-                        
-                        # Create a chunk every 20 rows for smaller files
-                        if len(current_chunk_content) >= 20:
-                            combined_text = "\n".join(current_chunk_content)
-                            documents.append({
-                                'content': combined_text,
-                                'source': os.path.basename(file_path),
-                                'type': 'csv',
-                                'title': f"Chunk {chunk_counter} (Rows {idx - len(current_chunk_content) + 1}-{idx + 1})",
-                                'chunk': chunk_counter,
-                                'rows': f"{idx - len(current_chunk_content) + 1}-{idx + 1}"
-                            })
-                            current_chunk_content = []
-                            chunk_counter += 1
-                
-                # Add remaining content as final chunk
-                if current_chunk_content:
-                    combined_text = "\n".join(current_chunk_content)
-                    documents.append({
-                        'content': combined_text,
-                        'source': os.path.basename(file_path),
-                        'type': 'csv',
-                        'title': f"Chunk {chunk_counter} (Rows {len(df) - len(current_chunk_content) + 1}-{len(df)})",
-                        'chunk': chunk_counter,
-                        'rows': f"{len(df) - len(current_chunk_content) + 1}-{len(df)}"
-                    })
-                        
+            for document in self._iter_csv_rows(file_path, source):
+                produced += 1
+                yield document
         except Exception as e:
+            # Chunks already handed out cannot be taken back
+            if produced:
+                raise
+            
             # If pandas fails, try reading as text with limits
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    lines = file.readlines()
-                    current_chunk_content = []
-                    chunk_counter = 1
-                    
-                    for idx, line in enumerate(lines):
-                        if idx >= settings.MAX_CSV_ROWS:
-                            break
-                        if line.strip():
-                            current_chunk_content.append(line.strip())
-                            
-                            # Create chunks every 50 lines for text fallback
-                            if len(current_chunk_content) >= 50:
-                                combined_text = "\n".join(current_chunk_content)
-                                documents.append({
-                                    'content': combined_text,
-                                    'source': os.path.basename(file_path),
-                                    'type': 'csv',
-                                    'title': f"Chunk {chunk_counter} (Lines {idx - len(current_chunk_content) + 1}-{idx + 1})",
-                                    'chunk': chunk_counter,
-                                    'lines': f"{idx - len(current_chunk_content) + 1}-{idx + 1}"
-                                })
-                                current_chunk_content = []
-                                chunk_counter += 1
+                yield from self._iter_csv_lines(file_path, source)
+            except Exception as text_error:
+                raise Exception(f"Failed to process CSV file: {str(e)}. Text fallback also failed: {str(text_error)}")
+    
+    def _iter_csv_rows(self, file_path: str, source: str) -> Iterator[Dict[str, Any]]:
+        """Yield chunks of formatted CSV rows"""
+        # Get file size to determine processing strategy
+        file_size = os.path.getsize(file_path)
+        file_size_mb = file_size / (1024 * 1024)
+        
+        # Row ranges are part of each chunk's point ID, so they keep their
+        # original numbering: a full chunk of n rows ending at 1-based row
+        # last is labelled (last - n)-(last), or (last - n)-(last - 1) for
+        # large files, and the final chunk counts back from the rows read
+        if file_size_mb > 2:
+            # For large files (>2MB), read in batches and use bigger chunks
+            frames = pd.read_csv(file_path, chunksize=CSV_READ_BATCH_ROWS, nrows=settings.MAX_CSV_ROWS)
+            rows_per_chunk = CSV_ROWS_PER_CHUNK_LARGE
+            last_row_shift = 1
+            total_rows = None
+        else:
+            # For smaller files, read normally but still optimize chunking
+            frame = pd.read_csv(file_path)
+            frames = [frame.iloc[:settings.MAX_CSV_ROWS]]
+            rows_per_chunk = CSV_ROWS_PER_CHUNK_SMALL
+            last_row_shift = 0
+            total_rows = len(frame)
+        
+        # Rows left over from the previous batch, with their 1-based row numbers
+        pending_text = np.empty(0, dtype=object)
+        pending_rows = np.empty(0, dtype=np.int64)
+        row_offset = 0
+        chunk_counter = 1
+        
+        for frame in frames:
+            row_text = self._format_csv_rows(frame).to_numpy(dtype=object)
+            row_numbers = np.arange(row_offset + 1, row_offset + len(frame) + 1)
+            row_offset += len(frame)
+            
+            # Skip rows where every cell is empty
+            non_empty = row_text != ""
+            pending_text = np.concatenate([pending_text, row_text[non_empty]])
+            pending_rows = np.concatenate([pending_rows, row_numbers[non_empty]])
+            
+            full = len(pending_text) - len(pending_text) % rows_per_chunk
+            for start in range(0, full, rows_per_chunk):
+                end = start + rows_per_chunk
+                last = pending_rows[end - 1]
+                yield self._csv_chunk(
+                    pending_text[start:end], last - rows_per_chunk, last - last_row_shift, chunk_counter, source
+                )
+                chunk_counter += 1
+            pending_text = pending_text[full:]
+            pending_rows = pending_rows[full:]
+        
+        # Add remaining content as final chunk
+        if len(pending_text):
+            last = total_rows if total_rows is not None else row_offset
+            yield self._csv_chunk(pending_text, last - len(pending_text) + 1, last, chunk_counter, source)
+    
+    def _iter_csv_lines(self, file_path: str, source: str) -> Iterator[Dict[str, Any]]:
+        """Yield chunks of raw CSV lines (fallback when pandas fails)"""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            current_chunk_content = []
+            chunk_counter = 1
+            line_count = 0
+            
+            for idx, line in enumerate(file):
+                line_count = idx + 1
+                if idx >= settings.MAX_CSV_ROWS:
+                    # The final chunk's range counts back from the last line of the file
+                    continue
+                if line.strip():
+                    current_chunk_content.append(line.strip())
                     
-                    # Add remaining content
-                    if current_chunk_content:
+                    # Create chunks every 50 lines for text fallback
+                    if len(current_chunk_content) >= 50:
                         combined_text = "\n".join(current_chunk_content)
-                        documents.append({
+                        yield {
                             'content': combined_text,
-                            'source': os.path.basename(file_path),
+                            'source': source,
                             'type': 'csv',
-                            'title': f"Chunk {chunk_counter} (Lines {len(lines) - len(current_chunk_content) + 1}-{len(lines)})",
+                            'title': f"Chunk {chunk_counter} (Lines {idx - len(current_chunk_content) + 1}-{idx + 1})",
                             'chunk': chunk_counter,
-                            'lines': f"{len(lines) - len(current_chunk_content) + 1}-{len(lines)}"
-                        })
-            except Exception as text_error:
-                raise Exception(f"Failed to process CSV file: {str(e)}. Text fallback also failed: {str(text_error)}")
+                            'lines': f"{idx - len(current_chunk_content) + 1}-{idx + 1}"
+                        }
+                        current_chunk_content = []
+                        chunk_counter += 1
+            
+            # Add remaining content
+            if current_chunk_content:
+                combined_text = "\n".join(current_chunk_content)
+                yield {
+                    'content': combined_text,
+                    'source': source,
+                    'type': 'csv',
+                    'title': f"Chunk {chunk_counter} (Lines {line_count - len(current_chunk_content) + 1}-{line_count})",
+                    'chunk': chunk_counter,
+                    'lines': f"{line_count - len(current_chunk_content) + 1}-{line_count}"
+                }
+    
+    @staticmethod
+    def _format_csv_rows(frame: pd.DataFrame) -> pd.Series:
+        """Render each row as "col: val | col: val", skipping empty cells
+        
+        Works a column at a time with pandas string operations instead of
+        iterating over rows.
+        """
+        if frame.empty or len(frame.columns) == 0:
+            return pd.Series([""] * len(frame), index=frame.index, dtype=object)
         
-        return documents
+        # Row-wise formatting saw every row upcast to the columns' common dtype,
+        # e.g. ints as 1.0 next to a float column. Chunk text feeds the point
+        # IDs, so values are cast the same way.
+        common_dtype = frame.iloc[:0].to_numpy().dtype
+        if common_dtype != object:
+            frame = frame.astype(common_dtype)
+        
+        pieces = []
+        for col in frame.columns:
+            values = frame[col]
+            piece = (f" | {col}: " + values.astype(str)).astype(object)
+            pieces.append(piece.where(values.notna(), ""))
+        
+        combined = pieces[0].str.cat(pieces[1:]) if len(pieces) > 1 else pieces[0]
+        # Every non-empty row starts with the " | " separator
+        return combined.str.slice(3)
     
-    def _process_txt(self, file_path: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _csv_chunk(row_text: np.ndarray, first_row: int, last_row: int, chunk_counter: int, source: str) -> Dict[str, Any]:
+        """Build a chunk document from consecutive formatted CSV rows"""
+        return {
+            'content': "\n".join(row_text),
+            'source': source,
+            'type': 'csv',
+            'title': f"Chunk {chunk_counter} (Rows {first_row}-{last_row})",
+            'chunk': chunk_counter,
+            'rows': f"{first_row}-{last_row}"
+        }
+    
+    def _process_txt(self, file_path: str, source: str) -> List[Dict[str, Any]]:
         """Process text file"""
-        documents = []
-        
+        return list(self._iter_txt(file_path, source))
+    
+    def _iter_txt(self, file_path: str, source: str) -> Iterator[Dict[str, Any]]:
+        """Yield text file chunks"""
         with open(file_path, 'r', encoding='utf-8') as file:
             text = file.read()
-            
-            if text.strip():
-                # Split text into chunks
-                chunks = self._split_text(text)
-                
-                for chunk_idx, chunk in enumerate(chunks):
-                    documents.append({
-                        'content': chunk,
-                        'source': os.path.basename(file_path),
-                        'type': 'txt',
-                        'title': f"Chunk {chunk_idx + 1}",
-                        'chunk': chunk_idx + 1
-                    })
         
-        return documents
+        if text.strip():
+            # Split text into chunks
+            for chunk_idx, chunk in enumerate(self.splitter.split(text)):
+                yield {
+                    'content': chunk,
+                    'source': source,
+                    'type': 'txt',
+                    'title': f"Chunk {chunk_idx + 1}",
+                    'chunk': chunk_idx + 1
+                }
     
     def _split_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
-        if len(text) <= self.chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + self.chunk_size
-            
-            # Try to break at a sentence boundary
-            if end < len(text):
-                # Look for sentence endings
-                sentence_endings = ['.', '!', '?', '\n\n']
-                for ending in sentence_endings:
-                    pos = text.rfind(ending, start, end)
-                    if pos > start + self.chunk_size // 2:  # Only break if it's not too early
-                        end = pos + 1
-                        break
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            # Move start position with overlap
-            start = end - self.chunk_overlap
-            if start >= len(text):
-                break
-        
-        return chunks
+        return list(self.splitter.split(text))
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
@@ -275,12 +320,15 @@ class DocumentProcessor:
         # Simple text chunking
         words = content.split()
         current_chunk = []
+        # Length of ' '.join(current_chunk), kept up to date incrementally
+        current_length = -1
         chunk_index = 0
         
         for word in words:
             current_chunk.append(word)
+            current_length += len(word) + 1
             
-            if len(' '.join(current_chunk)) >= self.chunk_size:
+            if current_length >= self.chunk_size:
                 chunk_content = ' '.join(current_chunk)
                 chunk = DocumentChunk(
                     id=str(uuid.uuid4()),
@@ -293,6 +341,7 @@ class DocumentProcessor:
                 # Keep overlap for next chunk
                 overlap_words = current_chunk[-self.chunk_overlap//10:]  # Approximate overlap
                 current_chunk = overlap_words
+                current_length = sum(len(w) for w in current_chunk) + len(current_chunk) - 1
                 chunk_index += 1
         
         # Add remaining content as final chunk
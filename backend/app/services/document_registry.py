@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Columns returned for each source, in table order
+SOURCE_FIELDS = (
+    'source', 'type', 'chunk_count', 'byte_size', 'content_hash',
+    'ingested_at', 'ingest_seconds', 'chunks_per_second'
+)
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentRegistry:
+    """Per-source document records kept next to the vector store
+
+    One SQLite row per uploaded source with its chunk count, file size,
+    file hash and ingest timing, updated on ingest and delete. Stats and
+    source listings read this table instead of scrolling the collection.
+    """
+
+    def __init__(self, db_path: str, collection_name: str):
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                collection TEXT NOT NULL,
+                source TEXT NOT NULL,
+                type TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                byte_size INTEGER NOT NULL,
+                content_hash TEXT,
+                ingested_at INTEGER NOT NULL,
+                ingest_seconds REAL,
+                chunks_per_second REAL,
+                PRIMARY KEY (collection, source)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def record_ingest(self, source: str, file_type: str, chunk_count: int, byte_size: int,
+                      content_hash: Optional[str], ingest_seconds: float, chunks_per_second: float) -> None:
+        """Insert or replace a source after it has been synced; sources without chunks are removed"""
+        if chunk_count <= 0:
+            self.delete(source)
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.collection_name, source, file_type, chunk_count, byte_size, content_hash,
+                 int(time.time()), ingest_seconds, chunks_per_second)
+            )
+            self._conn.commit()
+
+    def remove_chunks(self, chunk_counts: Dict[str, int]) -> None:
+        """Subtract deleted chunks per source, dropping sources left with none"""
+        if not chunk_counts:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sources SET chunk_count = chunk_count - ? WHERE collection = ? AND source = ?",
+                [(count, self.collection_name, source) for source, count in chunk_counts.items()]
+            )
+            self._conn.execute(
+                "DELETE FROM sources WHERE collection = ? AND chunk_count <= 0", (self.collection_name,)
+            )
+            self._conn.commit()
+
+    def delete(self, source: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM sources WHERE collection = ? AND source = ?", (self.collection_name, source)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every source of the collection"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sources WHERE collection = ?", (self.collection_name,))
+            self._conn.commit()
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(SOURCE_FIELDS)} FROM sources WHERE collection = ? AND source = ?",
+                (self.collection_name, source)
+            ).fetchone()
+        return dict(zip(SOURCE_FIELDS, row)) if row else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All sources, most recently ingested first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SOURCE_FIELDS)} FROM sources WHERE collection = ? "
+                f"ORDER BY ingested_at DESC, source",
+                (self.collection_name,)
+            ).fetchall()
+        return [dict(zip(SOURCE_FIELDS, row)) for row in rows]
+
+    def totals(self) -> Dict[str, int]:
+        """Number of sources, chunks and bytes"""
+        with self._lock:
+            documents, chunks, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0), COALESCE(SUM(byte_size), 0) "
+                "FROM sources WHERE collection = ?",
+                (self.collection_name,)
+            ).fetchone()
+        return {'documents': documents, 'chunks': chunks, 'bytes': size}
+
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Recreate the records from stored chunks (source, type, content, ingested_at payloads)
+
+        Used for collections ingested before the registry existed. The file
+        hash and timings are unknown, and byte_size is the chunk text size.
+        """
+        sources: Dict[str, Dict[str, Any]] = {}
+        for doc in documents:
+            record = sources.setdefault(doc.get('source', ''), {
+                'type': doc.get('type', ''), 'chunk_count': 0, 'byte_size': 0, 'ingested_at': 0
+            })
+            record['chunk_count'] += 1
+            record['byte_size'] += len(doc.get('content', '').encode('utf-8'))
+            record['ingested_at'] = max(record['ingested_at'], doc.get('ingested_at') or 0)
+
+        with self._lock:
+            self._conn.execute("DELETE FROM sources WHERE collection = ?", (self.collection_name,))
+            self._conn.executemany(
+                "INSERT INTO sources VALUES (?, ?, ?, ?, ?, NULL, ?, NULL, NULL)",
+                [
+                    (self.collection_name, source, record['type'], record['chunk_count'],
+                     record['byte_size'], record['ingested_at'] or int(time.time()))
+                    for source, record in sources.items()
+                ]
+            )
+            self._conn.commit()
+        return len(sources)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
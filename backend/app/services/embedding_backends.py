@@ -0,0 +1,136 @@
+import json
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Names accepted by EMBEDDING_BACKEND
+BACKENDS = ("sentence-transformers", "onnx", "onnx-int8")
+
+# Files written by scripts/export_onnx.py
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+ONNX_CONFIG_FILE = "embedding_config.json"
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into float32 embeddings
+
+    Implementations expose the tokenizer and max_seq_length of the underlying
+    model so chunking can be sized to what the encoder actually sees, and a
+    cache_key that identifies their vectors in the embedding cache.
+    """
+
+    name: str = ""
+    tokenizer: Any = None
+    max_seq_length: int = 0
+    dimension: int = 0
+    cache_key: str = ""
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts as a (len(texts), dimension) float32 matrix"""
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch SentenceTransformer model"""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.tokenizer = self.model.tokenizer
+        self.max_seq_length = self.model.max_seq_length
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        # Keeps embeddings cached before backends existed valid
+        self.cache_key = model_name
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime model exported by scripts/export_onnx.py
+
+    Runs the transformer on CPU through onnxruntime and applies the
+    SentenceTransformer pooling (mean over tokens, optional L2 normalization)
+    in numpy. quantized loads the dynamically quantized int8 export.
+    """
+
+    def __init__(self, model_name: str, model_dir: str, quantized: bool = False, threads: int = 0):
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "The ONNX embedding backend needs onnxruntime and transformers (pip install onnxruntime transformers)"
+            ) from e
+
+        model_file = os.path.join(model_dir, ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        if not os.path.exists(model_file):
+            raise RuntimeError(
+                f"{model_file} not found; export it with: python -m scripts.export_onnx --output {model_dir}"
+            )
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            config: Dict[str, Any] = json.load(f)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = config["max_seq_length"]
+        self.dimension = config["dimension"]
+        self.normalize = config.get("normalize", True)
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.cache_key = f"{model_name}@{self.name}"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Sort by length so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feeds = {name: inputs[name].astype(np.int64) for name in self.input_names if name in inputs}
+            if "token_type_ids" in self.input_names and "token_type_ids" not in feeds:
+                feeds["token_type_ids"] = np.zeros_like(inputs["input_ids"], dtype=np.int64)
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[batch] = pooled
+        return embeddings
+
+
+def create_embedding_backend(name: str, model_name: str, onnx_model_dir: str, onnx_threads: int = 0) -> EmbeddingBackend:
+    """Build the backend selected by EMBEDDING_BACKEND"""
+    if name == "sentence-transformers":
+        return SentenceTransformerBackend(model_name)
+    if name in ("onnx", "onnx-int8"):
+        return OnnxBackend(model_name, onnx_model_dir, quantized=name == "onnx-int8", threads=onnx_threads)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {name} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of chunk content used as the embedding cache key"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent SQLite cache of chunk embeddings keyed by content hash and model"""
+
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, db_path: str, model_name: str, dimension: int):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.dimension = dimension
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, content_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        # Counted once here and kept up to date by put_many, so stats() never scans the table
+        self._entries = self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+        ).fetchone()[0]
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached float32 vectors for the given content hashes"""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            for i in range(0, len(unique), self._LOOKUP_BATCH):
+                batch = unique[i:i + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND content_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if vector.shape[0] == self.dimension:
+                        found[key] = vector
+
+        return found
+
+    def put_many(self, hashes: List[str], vectors: np.ndarray) -> None:
+        """Store vectors (rows of a float32 matrix) under their content hashes"""
+        if not hashes:
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [
+            (self.model_name, key, vectors[i].tobytes())
+            for i, key in enumerate(hashes)
+        ]
+        with self._lock:
+            # A content hash always maps to the same vector for a model, so stored rows are kept
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, content_hash, vector) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._entries += cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove all cached vectors for the current model"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+            self._conn.commit()
+            self._entries = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Number of cached vectors for the current model (writes by other processes are not counted)"""
+        return {'entries': self._entries}
@@ -0,0 +1,98 @@
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from qdrant_client.models import SparseVector
+
+# Name of the sparse (lexical) vector next to the unnamed dense vector
+SPARSE_VECTOR_NAME = "bm25"
+
+# Words, keeping codes such as ERR-4012, SKU_88A1 or v2.3.1 together
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+CODE_SEPARATORS = re.compile(r"[-./_]")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can did do does for from had has have how i if in into is it its me my no not
+of on or our so than that the their them then there these they this to was we were what when where which who
+why will with would you your
+""".split())
+
+
+class SparseEncoder:
+    """Feature-hashed BM25 term vectors for Qdrant sparse search
+
+    Terms are hashed into a 31-bit index space with CRC32, so no vocabulary
+    has to be stored or kept in sync. Documents get BM25 term-frequency
+    saturation and length normalization. Queries weight every term equally,
+    which makes the dot product with a document vector its BM25 score
+    without the IDF factor. Stopwords are dropped on both sides to stand in
+    for it.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 250.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercased terms; codes are kept whole and also split into their parts"""
+        terms = []
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            if token in STOPWORDS:
+                continue
+            terms.append(token)
+            if CODE_SEPARATORS.search(token):
+                terms.extend(part for part in CODE_SEPARATORS.split(token) if part and part not in STOPWORDS)
+        return terms
+
+    @staticmethod
+    def _index(term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) & 0x7FFFFFFF
+
+    def _term_counts(self, terms: List[str]) -> Dict[int, int]:
+        """Occurrences per hashed term, in ascending index order as Qdrant stores them"""
+        counts: Dict[int, int] = {}
+        for term in terms:
+            index = self._index(term)
+            counts[index] = counts.get(index, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def encode_document(self, text: str) -> Optional[SparseVector]:
+        """BM25-weighted term vector of a chunk, or None if it has no terms"""
+        terms = self.tokenize(text)
+        if not terms:
+            return None
+        norm = self.k1 * (1 - self.b + self.b * len(terms) / self.avg_doc_length)
+        counts = self._term_counts(terms)
+        return SparseVector(
+            indices=list(counts),
+            values=[tf * (self.k1 + 1) / (tf + norm) for tf in counts.values()]
+        )
+
+    def encode_query(self, text: str) -> Optional[SparseVector]:
+        """Unit weight for each distinct query term, or None if it has no terms"""
+        counts = self._term_counts(self.tokenize(text))
+        if not counts:
+            return None
+        return SparseVector(indices=list(counts), values=[1.0] * len(counts))
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[Tuple[float, Sequence[Any]]], limit: int,
+                           k: int = 60) -> List[Tuple[Any, float]]:
+    """Merge (weight, points) rankings into (point, score) pairs, best first
+
+    A point scores weight / (k + rank) in every list it appears in, so
+    agreement between retrievers outranks a high position in just one.
+    Points are matched by ID; the first copy seen is returned.
+    """
+    scores: Dict[Any, float] = {}
+    points: Dict[Any, Any] = {}
+    for weight, ranked in ranked_lists:
+        if weight <= 0:
+            continue
+        for rank, point in enumerate(ranked, start=1):
+            scores[point.id] = scores.get(point.id, 0.0) + weight / (k + rank)
+            points.setdefault(point.id, point)
+    best = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [(points[point_id], scores[point_id]) for point_id in best]
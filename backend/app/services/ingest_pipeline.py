@@ -0,0 +1,232 @@
+import queue
+import threading
+import time
+import logging
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.models.document import DocumentStatus
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+class StageMetrics:
+    """Throughput counters for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'batches': self.batches,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'wait_seconds': round(self.wait_seconds, 3),
+            'items_per_second': round(self.items / self.busy_seconds, 2) if self.busy_seconds > 0 else 0.0
+        }
+
+
+class QueueMetrics:
+    """Depth samples for a bounded queue, taken on every put"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.max_depth = 0
+        self._depth_total = 0
+        self._samples = 0
+
+    def sample(self, depth: int) -> None:
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._samples += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'maxsize': self.maxsize,
+            'max_depth': self.max_depth,
+            'mean_depth': round(self._depth_total / self._samples, 2) if self._samples else 0.0
+        }
+
+
+class IngestPipeline:
+    """Parse -> embed -> upsert stages connected by bounded queues
+
+    Parsing runs in a producer thread and encoding in an embed thread, while
+    upserts run on the calling thread, so CPU-bound encoding overlaps Qdrant
+    network I/O. A full queue blocks the stage feeding it (backpressure), which
+    keeps at most queue_size batches in flight between any two stages.
+    """
+
+    def __init__(self, vector_store, batch_size: int, queue_size: int,
+                 progress: Optional[Callable[..., None]] = None):
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        self.progress = progress or (lambda *args, **kwargs: None)
+
+        self.parse_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.upsert_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.stages = {name: StageMetrics(name) for name in ('parse', 'embed', 'upsert')}
+        self.queues = {'parse_to_embed': QueueMetrics(queue_size), 'embed_to_upsert': QueueMetrics(queue_size)}
+
+        # IDs of every chunk produced by the source, stored or not
+        self.seen_ids: Set[str] = set()
+        self.counters = {
+            'skipped': 0, 'cache_hits': 0, 'cache_misses': 0, 'truncated_chunks': 0, 'truncated_tokens': 0
+        }
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(self, documents: Iterable[Dict[str, Any]], existing_ids: Set[str]) -> Dict[str, Any]:
+        """Run all stages to completion and return throughput stats
+
+        Re-raises the first error from any stage.
+        """
+        start_time = time.perf_counter()
+        self.progress('embed', DocumentStatus.PROCESSING)
+        self.progress('upsert', DocumentStatus.PROCESSING)
+
+        threads = [
+            threading.Thread(target=self._parse_stage, args=(documents,), name="ingest-parse", daemon=True),
+            threading.Thread(target=self._embed_stage, args=(existing_ids,), name="ingest-embed", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._upsert_stage()
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        upserted = self.stages['upsert'].items
+        self.progress('embed', DocumentStatus.COMPLETED, items_done=self.stages['embed'].items,
+                      items_total=self.stages['embed'].items)
+        self.progress('upsert', DocumentStatus.COMPLETED, items_done=upserted, items_total=upserted)
+
+        elapsed = time.perf_counter() - start_time
+        return {
+            'processed': self.stages['parse'].items,
+            'chunks': upserted,
+            **self.counters,
+            'encode_seconds': round(self.stages['embed'].busy_seconds, 3),
+            'upsert_seconds': round(self.stages['upsert'].busy_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'chunks_per_second': round(upserted / elapsed, 2) if elapsed > 0 else 0.0,
+            'pipeline': self.metrics()
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-stage throughput and queue depths; the busiest stage is the bottleneck"""
+        busiest = max(self.stages.values(), key=lambda stage: stage.busy_seconds)
+        return {
+            'stages': {name: stage.as_dict() for name, stage in self.stages.items()},
+            'queues': {name: metrics.as_dict() for name, metrics in self.queues.items()},
+            'bottleneck': busiest.name
+        }
+
+    def _fail(self, error: BaseException) -> None:
+        self._errors.append(error)
+        self._stop.set()
+
+    def _put(self, target: "queue.Queue", queue_metrics: QueueMetrics, item: Any, stage: StageMetrics) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            queue_metrics.sample(target.qsize())
+            stage.wait_seconds += time.perf_counter() - start
+            return True
+        return False
+
+    def _get(self, source: "queue.Queue", stage: StageMetrics) -> Any:
+        """Blocking get that returns _DONE once the pipeline is stopping"""
+        start = time.perf_counter()
+        while True:
+            try:
+                item = source.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
+                continue
+            stage.wait_seconds += time.perf_counter() - start
+            return item
+
+    def _parse_stage(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Producer: pull chunks from the parser in batches"""
+        stage = self.stages['parse']
+        try:
+            iterator = iter(documents)
+            while True:
+                start = time.perf_counter()
+                batch = list(islice(iterator, self.batch_size))
+                stage.busy_seconds += time.perf_counter() - start
+                if not batch:
+                    break
+                stage.items += len(batch)
+                stage.batches += 1
+                if not self._put(self.parse_queue, self.queues['parse_to_embed'], batch, stage):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.parse_queue, self.queues['parse_to_embed'], _DONE, stage)
+
+    def _embed_stage(self, existing_ids: Set[str]) -> None:
+        """Skip stored chunks and encode the rest"""
+        stage = self.stages['embed']
+        known_ids = set(existing_ids)
+        try:
+            while True:
+                batch = self._get(self.parse_queue, stage)
+                if batch is _DONE:
+                    break
+
+                start = time.perf_counter()
+                prepared = self.vector_store.prepare_points(batch, known_ids)
+                stage.busy_seconds += time.perf_counter() - start
+
+                known_ids.update(prepared['point_ids'])
+                self.seen_ids.update(prepared['point_ids'])
+                for key in self.counters:
+                    self.counters[key] += prepared[key]
+                stage.items += len(prepared['ids'])
+                stage.batches += 1
+                self.progress('embed', DocumentStatus.PROCESSING, items_done=stage.items)
+
+                if prepared['ids'] and not self._put(self.upsert_queue, self.queues['embed_to_upsert'], prepared, stage):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.upsert_queue, self.queues['embed_to_upsert'], _DONE, stage)
+
+    def _upsert_stage(self) -> None:
+        """Write encoded batches to Qdrant"""
+        stage = self.stages['upsert']
+        while True:
+            prepared = self._get(self.upsert_queue, stage)
+            if prepared is _DONE:
+                break
+
+            start = time.perf_counter()
+            stage.items += self.vector_store.upsert_points(prepared)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.batches += 1
+            self.progress('upsert', DocumentStatus.PROCESSING, items_done=stage.items)
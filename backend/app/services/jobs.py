@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from app.models.document import DocumentStatus
+from app.models.job import IngestJob, JobStage
+
+logger = logging.getLogger(__name__)
+
+# Ingestion stages reported on every job
+STAGES = ("parse", "embed", "upsert")
+
+
+class JobQueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept more jobs"""
+
+
+class IngestJobManager:
+    """Runs file ingestion on a bounded worker pool and tracks per-stage progress"""
+
+    def __init__(self, rag_service, max_workers: int = 1, max_pending: int = 8, history_size: int = 100):
+        self.rag_service = rag_service
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history_size = history_size
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._stage_started: Dict[tuple, float] = {}
+        # Upload files of queued jobs that no worker has picked up yet, by job ID
+        self._pending_files: Dict[str, str] = {}
+        self._active = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: str, file_type: str, filename: str, file_size: int,
+               content_hash: Optional[str] = None, replace: bool = False) -> IngestJob:
+        """Queue a file for ingestion; the file is deleted once the job finishes"""
+        with self._lock:
+            if self._closed:
+                raise JobQueueFullError("Ingestion is shutting down. Try again later.")
+            if self._active >= self.max_workers + self.max_pending:
+                raise JobQueueFullError(
+                    f"Ingestion queue is full ({self._active} jobs in progress). Try again later."
+                )
+
+            job = IngestJob(
+                id=str(uuid.uuid4()),
+                filename=filename,
+                file_type=file_type,
+                file_size=file_size,
+                content_hash=content_hash,
+                replace=replace,
+                stages={stage: JobStage() for stage in STAGES}
+            )
+            self._jobs[job.id] = job
+            self._pending_files[job.id] = file_path
+            self._active += 1
+            self._trim_history()
+            snapshot = job.model_copy(deep=True)
+
+        try:
+            self._executor.submit(self._run, job.id, file_path)
+        except RuntimeError:
+            # shutdown() ran after the job was queued and has already failed it
+            raise JobQueueFullError("Ingestion is shutting down. Try again later.")
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Return a snapshot of a job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job is not None else None
+
+    def list_jobs(self) -> List[IngestJob]:
+        """Return snapshots of all tracked jobs, newest first"""
+        with self._lock:
+            return [job.model_copy(deep=True) for job in reversed(self._jobs.values())]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue occupancy for monitoring"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active_jobs": self._active,
+                "max_pending": self.max_pending,
+                "tracked_jobs": len(self._jobs)
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and fail jobs that have not started, deleting their files
+
+        Running jobs are left to finish.
+        """
+        with self._lock:
+            self._closed = True
+            pending, self._pending_files = self._pending_files, {}
+            now = datetime.utcnow()
+            for job_id in pending:
+                job = self._jobs[job_id]
+                job.status = DocumentStatus.FAILED
+                job.error = "Server shut down before the job started"
+                job.finished_at = now
+            self._active -= len(pending)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        for file_path in pending.values():
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+        if pending:
+            logger.warning("Failed %d queued ingestion jobs on shutdown", len(pending))
+
+    def _trim_history(self) -> None:
+        """Forget the oldest finished jobs beyond the history size"""
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in (DocumentStatus.COMPLETED, DocumentStatus.FAILED)
+        ]
+        for job_id in finished[:max(0, len(self._jobs) - self.history_size)]:
+            del self._jobs[job_id]
+
+    def _on_progress(self, job_id: str, stage: str, status: DocumentStatus,
+                     items_done: Optional[int] = None, items_total: Optional[int] = None) -> None:
+        """Progress callback passed down to the ingestion code"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or stage not in job.stages:
+                return
+
+            job_stage = job.stages[stage]
+            now = time.perf_counter()
+            if status == DocumentStatus.PROCESSING and job_stage.status == DocumentStatus.PENDING:
+                self._stage_started[(job_id, stage)] = now
+            elif status in (DocumentStatus.COMPLETED, DocumentStatus.FAILED):
+                started = self._stage_started.pop((job_id, stage), now)
+                job_stage.seconds = round(now - started, 3)
+
+            job_stage.status = status
+            if items_done is not None:
+                job_stage.items_done = items_done
+            if items_total is not None:
+                job_stage.items_total = items_total
+
+    def _run(self, job_id: str, file_path: str) -> None:
+        """Worker entry point"""
+        start_time = time.perf_counter()
+        with self._lock:
+            if self._pending_files.pop(job_id, None) is None:
+                # Failed by shutdown before this worker picked it up
+                return
+            job = self._jobs[job_id]
+            job.status = DocumentStatus.PROCESSING
+            job.started_at = datetime.utcnow()
+            job.queue_seconds = round((job.started_at - job.created_at).total_seconds(), 3)
+            file_type, filename, content_hash, replace = job.file_type, job.filename, job.content_hash, job.replace
+
+        try:
+            result = self.rag_service.upload_document(
+                file_path,
+                file_type,
+                filename,
+                content_hash=content_hash,
+                replace=replace,
+                progress=lambda *args, **kwargs: self._on_progress(job_id, *args, **kwargs)
+            )
+            error = None if result["success"] else result["message"]
+        except Exception as e:
+            result, error = None, f"Error processing document: {str(e)}"
+        finally:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.finished_at = datetime.utcnow()
+                job.processing_seconds = round(time.perf_counter() - start_time, 3)
+                if error is None:
+                    job.status = DocumentStatus.COMPLETED
+                    job.result = result
+                else:
+                    job.status = DocumentStatus.FAILED
+                    job.error = error
+                    for stage in job.stages.values():
+                        if stage.status == DocumentStatus.PROCESSING:
+                            stage.status = DocumentStatus.FAILED
+            for stage in STAGES:
+                self._stage_started.pop((job_id, stage), None)
+            self._active -= 1
+
+        if error is None:
+            logger.info("Ingestion job %s finished in %.2fs", job_id, time.perf_counter() - start_time)
+        else:
+            logger.error("Ingestion job %s failed: %s", job_id, error)
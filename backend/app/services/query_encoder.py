@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Stops the encoder thread
+_STOP = object()
+
+
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts values <= its upper bound"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'max': round(self.max, 3)
+        }
+
+
+class BatchingQueryEncoder:
+    """Coalesces concurrent encode requests into batched forward passes
+
+    A single worker thread waits for the first queued text, then keeps
+    collecting until window_ms have passed or max_batch texts are queued, and
+    encodes them with one encode_batch call. Duplicate texts in a batch are
+    encoded once. Callers get a concurrent.futures.Future per text, which
+    async code can await through asyncio.wrap_future. Futures cancelled
+    while queued (e.g. by a disconnected client) are skipped.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Sequence[Any]], window_ms: float, max_batch: int,
+                 timeout_seconds: Optional[float] = 30.0):
+        self.encode_batch = encode_batch
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.timeout_seconds = timeout_seconds
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_delay_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100])
+        self.encode_ms = Histogram([1, 2, 5, 10, 20, 50, 100, 200])
+        self._metrics_lock = threading.Lock()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text; the future resolves to its vector"""
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str) -> Any:
+        """Blocking single-text encode through the batcher
+        
+        Raises concurrent.futures.TimeoutError after timeout_seconds.
+        """
+        future = self.submit(text)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except Exception:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Finish queued work and stop the worker thread"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size, queueing delay and encode time histograms"""
+        with self._metrics_lock:
+            return {
+                'window_ms': self.window_seconds * 1000,
+                'max_batch': self.max_batch,
+                'batch_size': self.batch_sizes.as_dict(),
+                'queue_delay_ms': self.queue_delay_ms.as_dict(),
+                'encode_ms': self.encode_ms.as_dict()
+            }
+
+    def _collect(self, first) -> tuple:
+        """Gather requests arriving within the window after the first one"""
+        batch = [first]
+        deadline = time.perf_counter() + self.window_seconds
+        stopping = False
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stopping = self._collect(first)
+            try:
+                self._process(batch)
+            except Exception:
+                # Never let one batch kill the only encoder thread
+                logger.exception("Query encoder failed on a batch of %d", len(batch))
+            if stopping:
+                return
+
+    def _process(self, batch: List[tuple]) -> None:
+        """Encode one batch and resolve its futures"""
+        # Claim the futures; cancelled ones are dropped and cannot be cancelled from here on
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            vectors = dict(zip(texts, self.encode_batch(texts)))
+        except Exception as e:
+            logger.error("Query encoding failed for a batch of %d: %s", len(texts), e)
+            for _, future, _ in batch:
+                future.set_exception(e)
+        else:
+            for text, future, _ in batch:
+                future.set_result(vectors[text])
+        finished = time.perf_counter()
+
+        with self._metrics_lock:
+            self.batch_sizes.observe(len(batch))
+            self.encode_ms.observe((finished - started) * 1000)
+            for _, _, queued_at in batch:
+                self.queue_delay_ms.observe((started - queued_at) * 1000)
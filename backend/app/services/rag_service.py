@@ -1,31 +1,119 @@
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from typing import List, Dict, Any, Optional, Callable, Iterator, AsyncIterator, Tuple, Union
+from openai import OpenAI, AsyncOpenAI
 from app.services.vector_store import VectorStore
 from app.services.document_processor import DocumentProcessor
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.document_registry import DocumentRegistry, file_hash
+from app.models.document import DocumentStatus, SearchFilters, HybridSearch
+from app.core.config import settings
+from collections import Counter
 import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _report_parsed(documents: Iterator[Dict[str, Any]], progress: Callable[..., None]) -> Iterator[Dict[str, Any]]:
+    """Pass chunks through while reporting parse-stage progress"""
+    progress('parse', DocumentStatus.PROCESSING)
+    count = 0
+    for document in documents:
+        count += 1
+        if count % 100 == 0:
+            progress('parse', DocumentStatus.PROCESSING, items_done=count)
+        yield document
+    progress('parse', DocumentStatus.COMPLETED, items_done=count, items_total=count)
 
 class RAGService:
     """Service for RAG (Retrieval-Augmented Generation) operations"""
     
     def __init__(self, openai_api_key: str):
         self.vector_store = VectorStore()
-        self.document_processor = DocumentProcessor()
-        self.openai_client = OpenAI(api_key=openai_api_key)
+        self.document_processor = self._create_document_processor()
+        self.openai_client = OpenAI(api_key=openai_api_key, base_url=settings.OPENAI_BASE_URL)
+        # Used by the async request path so slow completions don't block the event loop
+        self.async_openai_client = AsyncOpenAI(api_key=openai_api_key, base_url=settings.OPENAI_BASE_URL)
+        # Generated answers reused for paraphrased questions over the same sources
+        self.answer_cache = (
+            SemanticAnswerCache(
+                settings.ANSWER_CACHE_SIZE,
+                settings.ANSWER_CACHE_TTL_SECONDS,
+                settings.ANSWER_CACHE_THRESHOLD,
+                settings.EMBEDDING_DIMENSION
+            )
+            if settings.ANSWER_CACHE_ENABLED else None
+        )
+        # Per-source records behind stats and the source listing
+        self.document_registry = DocumentRegistry(settings.DOCUMENT_REGISTRY_PATH, self.vector_store.collection_name)
+        self._backfill_registry()
+    
+    def _backfill_registry(self) -> None:
+        """Build the registry from stored chunks when the collection predates it"""
+        if self.document_registry.totals()['documents'] or not self.vector_store.get_stats().get('total_points'):
+            return
+        count = self.document_registry.rebuild(
+            self.vector_store.iter_documents(fields=['source', 'type', 'content', 'ingested_at'])
+        )
+        logger.info("Rebuilt document registry with %d sources from the collection", count)
     
-    def upload_document(self, file_path: str, file_type: str) -> Dict[str, Any]:
-        """Upload and process a document"""
+    def _create_document_processor(self) -> DocumentProcessor:
+        """Chunk by characters, or by model tokens when CHUNKING_MODE is tokens"""
+        if settings.CHUNKING_MODE == "tokens":
+            return DocumentProcessor(
+                tokenizer=self.vector_store.tokenizer,
+                chunk_size=self.vector_store.token_chunk_size(),
+                chunk_overlap=settings.CHUNK_OVERLAP_TOKENS
+            )
+        if settings.CHUNKING_MODE != "chars":
+            raise ValueError(f"Unknown CHUNKING_MODE: {settings.CHUNKING_MODE}")
+        return DocumentProcessor()
+    
+    def upload_document(self, file_path: str, file_type: str, source_name: Optional[str] = None,
+                        progress: Optional[Callable[..., None]] = None,
+                        content_hash: Optional[str] = None, replace: bool = False) -> Dict[str, Any]:
+        """Upload and process a document
+        
+        Re-uploading a file with the same source name only updates the
+        chunks that changed and removes the ones that no longer exist.
+        progress receives per-stage updates (parse, embed, upsert).
+        content_hash is the file's SHA-256 if the caller already has it.
+        replace deletes the source's stored chunks first and re-embeds all of
+        them.
+        """
         try:
-            # Process the document
-            documents = self.document_processor.process_file(file_path, file_type)
+            source = source_name or os.path.basename(file_path)
             
-            # Add to vector store
-            self.vector_store.add_documents(documents)
+            # Chunks are parsed lazily while earlier batches are embedded
+            documents = self.document_processor.iter_file(file_path, file_type, source_name=source)
+            if progress:
+                documents = _report_parsed(documents, progress)
+            
+            # Sync the source's chunks in the vector store
+            ingest_stats = self.vector_store.sync_source(source, documents, progress=progress, replace=replace)
+            self.document_registry.record_ingest(
+                source,
+                file_type,
+                chunk_count=ingest_stats["stored"],
+                byte_size=os.path.getsize(file_path),
+                content_hash=content_hash or (file_hash(file_path) if settings.UPLOAD_HASH_CONTENT else None),
+                ingest_seconds=ingest_stats["elapsed_seconds"],
+                chunks_per_second=ingest_stats["chunks_per_second"]
+            )
             
             return {
                 "success": True,
-                "message": f"Successfully processed {len(documents)} document chunks",
-                "chunks_processed": len(documents),
-                "file_type": file_type
+                "message": f"Successfully processed {ingest_stats['processed']} document chunks",
+                "chunks_processed": ingest_stats["processed"],
+                "chunks_stored": ingest_stats["stored"],
+                "chunks_added": ingest_stats["chunks"],
+                "chunks_unchanged": ingest_stats["skipped"],
+                "chunks_deleted": ingest_stats["deleted"],
+                "chunks_replaced": ingest_stats["replaced"],
+                "embedding_cache_hits": ingest_stats["cache_hits"],
+                "chunks_truncated": ingest_stats["truncated_chunks"],
+                "tokens_truncated": ingest_stats["truncated_tokens"],
+                "file_type": file_type,
+                "ingest_stats": ingest_stats
             }
         except Exception as e:
             return {
@@ -33,14 +121,39 @@ class RAGService:
                 "message": f"Error processing document: {str(e)}"
             }
     
-    def search_documents(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search_documents(self, query: str, top_k: int = 5, filters: Optional[SearchFilters] = None,
+                         score_threshold: Optional[float] = None,
+                         hybrid: Optional[HybridSearch] = None) -> List[Dict[str, Any]]:
         """Search for relevant documents"""
         try:
-            results = self.vector_store.search(query, n_results=top_k)
+            results = self.vector_store.search(
+                query, n_results=top_k, filters=filters, score_threshold=score_threshold, hybrid=hybrid
+            )
             return results
         except Exception as e:
             return []
     
+    @staticmethod
+    def _build_messages(query: str, context_documents: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Chat messages asking the model to answer from the retrieved context"""
+        # Prepare context from retrieved documents
+        context = "\n\n".join([doc['content'] for doc in context_documents])
+        
+        # Create prompt for OpenAI
+        prompt = f"""Based on the following context, please provide a helpful and accurate response to the user's question.
+
+Context:
+{context}
+
+User Question: {query}
+
+Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to answer the question, please say so."""
+        
+        return [
+            {"role": "system", "content": "You are a helpful assistant that provides accurate information based on the given context."},
+            {"role": "user", "content": prompt}
+        ]
+    
     def generate_response(self, query: str, context_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate AI response using retrieved context"""
         try:
@@ -50,27 +163,11 @@ class RAGService:
                     "message": "No relevant documents found to generate response"
                 }
             
-            # Prepare context from retrieved documents
-            context = "\n\n".join([doc['content'] for doc in context_documents])
-            
-            # Create prompt for OpenAI
-            prompt = f"""Based on the following context, please provide a helpful and accurate response to the user's question.
-
-Context:
-{context}
-
-User Question: {query}
-
-Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to answer the question, please say so."""
-
             # Generate response using OpenAI
             response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that provides accurate information based on the given context."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
+                model=settings.OPENAI_MODEL,
+                messages=self._build_messages(query, context_documents),
+                max_tokens=settings.MAX_TOKENS,
                 temperature=0.7
             )
             
@@ -89,11 +186,113 @@ Please provide a comprehensive answer based on the context provided. If the cont
                 "message": f"Error generating response: {str(e)}"
             }
     
-    def search_and_generate(self, query: str, top_k: int = 5) -> Dict[str, Any]:
+    def _cached_answer(self, query_embedding, search_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Answer generated earlier for a similar query over the same chunks"""
+        if self.answer_cache is None:
+            return None
+        return self.answer_cache.get(query_embedding, [doc['id'] for doc in search_results])
+    
+    def _store_answer(self, query_embedding, search_results: List[Dict[str, Any]], response: Dict[str, Any]) -> None:
+        """Remember a successfully generated answer"""
+        if self.answer_cache is None or not response.get("success"):
+            return
+        self.answer_cache.set(
+            query_embedding,
+            [doc['id'] for doc in search_results],
+            {key: response[key] for key in ("success", "response", "sources", "context_used")}
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Vector store cache counters plus the answer cache"""
+        return {
+            **self.vector_store.get_cache_stats(),
+            'answers': self.answer_cache.stats() if self.answer_cache is not None else None
+        }
+    
+    def search_and_generate(self, query: str, top_k: int = 5, filters: Optional[SearchFilters] = None,
+                            score_threshold: Optional[float] = None,
+                            hybrid: Optional[HybridSearch] = None) -> Dict[str, Any]:
         """Search for documents and generate a response"""
         try:
             # Search for relevant documents
-            search_results = self.search_documents(query, top_k)
+            search_results = self.search_documents(query, top_k, filters, score_threshold, hybrid)
+            
+            if not search_results:
+                return {
+                    "success": False,
+                    "message": "No relevant documents found",
+                    "search_results": []
+                }
+            
+            # Generate AI response, unless a similar question was answered from the same chunks
+            query_embedding = self.vector_store.embed_query(query) if self.answer_cache is not None else None
+            response = self._cached_answer(query_embedding, search_results)
+            cached = response is not None
+            if not cached:
+                response = self.generate_response(query, search_results)
+                self._store_answer(query_embedding, search_results, response)
+            
+            return {
+                "success": True,
+                "search_results": search_results,
+                "ai_response": response.get("response", ""),
+                "sources": response.get("sources", []),
+                "context_used": response.get("context_used", 0),
+                "cached": cached
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Error in search and generate: {str(e)}"
+            }
+    
+    async def asearch_documents(self, query: str, top_k: int = 5, filters: Optional[SearchFilters] = None,
+                                score_threshold: Optional[float] = None,
+                                hybrid: Optional[HybridSearch] = None) -> List[Dict[str, Any]]:
+        """Async search_documents"""
+        try:
+            return await self.vector_store.asearch(
+                query, n_results=top_k, filters=filters, score_threshold=score_threshold, hybrid=hybrid
+            )
+        except Exception as e:
+            return []
+    
+    async def agenerate_response(self, query: str, context_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async generate_response using the AsyncOpenAI client"""
+        try:
+            if not context_documents:
+                return {
+                    "success": False,
+                    "message": "No relevant documents found to generate response"
+                }
+            
+            response = await self.async_openai_client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=self._build_messages(query, context_documents),
+                max_tokens=settings.MAX_TOKENS,
+                temperature=0.7
+            )
+            
+            return {
+                "success": True,
+                "response": response.choices[0].message.content,
+                "sources": [doc['metadata'] for doc in context_documents],
+                "context_used": len(context_documents)
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Error generating response: {str(e)}"
+            }
+    
+    async def asearch_and_generate(self, query: str, top_k: int = 5, filters: Optional[SearchFilters] = None,
+                                   score_threshold: Optional[float] = None,
+                                   hybrid: Optional[HybridSearch] = None) -> Dict[str, Any]:
+        """Async search_and_generate"""
+        try:
+            search_results = await self.asearch_documents(query, top_k, filters, score_threshold, hybrid)
             
             if not search_results:
                 return {
@@ -102,15 +301,20 @@ Please provide a comprehensive answer based on the context provided. If the cont
                     "search_results": []
                 }
             
-            # Generate AI response
-            response = self.generate_response(query, search_results)
+            query_embedding = await self.vector_store.aembed_query(query) if self.answer_cache is not None else None
+            response = self._cached_answer(query_embedding, search_results)
+            cached = response is not None
+            if not cached:
+                response = await self.agenerate_response(query, search_results)
+                self._store_answer(query_embedding, search_results, response)
             
             return {
                 "success": True,
                 "search_results": search_results,
                 "ai_response": response.get("response", ""),
                 "sources": response.get("sources", []),
-                "context_used": response.get("context_used", 0)
+                "context_used": response.get("context_used", 0),
+                "cached": cached
             }
             
         except Exception as e:
@@ -119,6 +323,99 @@ Please provide a comprehensive answer based on the context provided. If the cont
                 "message": f"Error in search and generate: {str(e)}"
             }
     
+    async def astream_search_and_generate(self, query: str, top_k: int = 5, filters: Optional[SearchFilters] = None,
+                                          score_threshold: Optional[float] = None,
+                                          hybrid: Optional[HybridSearch] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Search, then stream the answer as (event, data) pairs
+        
+        Emits 'sources' as soon as retrieval finishes, one 'token' per streamed
+        completion delta and a final 'done' with timings, or 'error' instead.
+        """
+        start_time = time.perf_counter()
+        try:
+            search_results = await self.asearch_documents(query, top_k, filters, score_threshold, hybrid)
+            retrieval_ms = (time.perf_counter() - start_time) * 1000
+            yield 'sources', {
+                "search_results": search_results,
+                "sources": [doc['metadata'] for doc in search_results],
+                "retrieval_ms": round(retrieval_ms, 1)
+            }
+            if not search_results:
+                yield 'error', {"message": "No relevant documents found"}
+                return
+            
+            query_embedding = await self.vector_store.aembed_query(query) if self.answer_cache is not None else None
+            cached = self._cached_answer(query_embedding, search_results)
+            if cached is not None:
+                yield 'token', {"text": cached["response"]}
+                elapsed_ms = round((time.perf_counter() - start_time) * 1000, 1)
+                yield 'done', {
+                    "context_used": cached["context_used"],
+                    "tokens": 1,
+                    "retrieval_ms": round(retrieval_ms, 1),
+                    "time_to_first_token_ms": elapsed_ms,
+                    "total_ms": elapsed_ms,
+                    "cached": True
+                }
+                return
+            
+            stream = await self.async_openai_client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=self._build_messages(query, search_results),
+                max_tokens=settings.MAX_TOKENS,
+                temperature=0.7,
+                stream=True
+            )
+            first_token_ms = None
+            tokens = 0
+            parts = []
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - start_time) * 1000
+                    tokens += 1
+                    parts.append(text)
+                    yield 'token', {"text": text}
+            finally:
+                # Stop generation when the client disconnects mid-stream
+                await stream.close()
+            
+            total_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(
+                "Streamed answer: retrieval %.0fms, first token %sms, total %.0fms, %d chunks",
+                retrieval_ms, f"{first_token_ms:.0f}" if first_token_ms is not None else "-", total_ms, tokens
+            )
+            self._store_answer(query_embedding, search_results, {
+                "success": bool(parts),
+                "response": "".join(parts),
+                "sources": [doc['metadata'] for doc in search_results],
+                "context_used": len(search_results)
+            })
+            yield 'done', {
+                "context_used": len(search_results),
+                "tokens": tokens,
+                "retrieval_ms": round(retrieval_ms, 1),
+                "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_ms": round(total_ms, 1),
+                "cached": False
+            }
+        except Exception as e:
+            yield 'error', {"message": f"Error generating response: {str(e)}"}
+    
+    def list_documents(self, limit: int = 100, cursor: Optional[str] = None,
+                       fields: Optional[List[str]] = None) -> tuple:
+        """Get one page of documents and the cursor of the next page"""
+        return self.vector_store.list_documents(limit, cursor, fields)
+    
+    def iter_documents(self, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield every document in the vector store, page by page"""
+        return self.vector_store.iter_documents(fields)
+    
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Get all documents from the vector store"""
         try:
@@ -129,14 +426,53 @@ Please provide a comprehensive answer based on the context provided. If the cont
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document from the vector store"""
         try:
-            return self.vector_store.delete_document(doc_id)
+            sources = self.vector_store.get_point_sources([doc_id])
+            deleted = self.vector_store.delete_document(doc_id)
+            if deleted:
+                self.document_registry.remove_chunks(Counter(sources.values()))
+            return deleted
         except Exception:
             return False
     
+    def delete_documents(self, doc_ids: List[Union[int, str]]) -> Dict[str, Any]:
+        """Delete many documents by (parsed) point ID with one lookup and one delete
+
+        IDs that match no document are skipped and returned as not_found.
+        """
+        sources = self.vector_store.get_point_sources(doc_ids)
+        self.vector_store.delete_points([doc_id for doc_id in doc_ids if str(doc_id) in sources])
+        self.document_registry.remove_chunks(Counter(sources.values()))
+        return {
+            'deleted': len(sources),
+            'not_found': [doc_id for doc_id in doc_ids if str(doc_id) not in sources]
+        }
+    
+    def delete_source(self, source: str) -> int:
+        """Delete every chunk of an uploaded source file; returns the number deleted"""
+        deleted = self.vector_store.delete_source(source)
+        self.document_registry.delete(source)
+        return deleted
+    
+    def list_sources(self) -> List[Dict[str, Any]]:
+        """Uploaded sources with their chunk counts, sizes and ingest timings"""
+        return self.document_registry.list()
+    
+    def get_document_stats(self) -> Dict[str, int]:
+        """Source, chunk and byte totals from the registry"""
+        return self.document_registry.totals()
+    
+    async def aclose(self) -> None:
+        """Close the async OpenAI and Qdrant clients"""
+        await self.async_openai_client.close()
+        await self.vector_store.aclose()
+    
     def clear_all_documents(self) -> bool:
         """Clear all documents from the vector store"""
         try:
             self.vector_store.clear_all()
+            self.document_registry.clear()
+            if self.answer_cache is not None:
+                self.answer_cache.clear()
             return True
         except Exception:
             return False 
\ No newline at end of file
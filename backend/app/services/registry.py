@@ -0,0 +1,87 @@
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.services.rag_service import RAGService
+from app.services.jobs import IngestJobManager
+
+logger = logging.getLogger(__name__)
+
+# Process-wide service instances, created once per worker
+_lock = threading.Lock()
+_rag_service: Optional[RAGService] = None
+_job_manager: Optional[IngestJobManager] = None
+_startup_seconds: Optional[float] = None
+_started_at: Optional[float] = None
+
+
+def init_services() -> RAGService:
+    """Create the shared RAG service (embedding model, Qdrant and OpenAI clients) once"""
+    global _rag_service, _job_manager, _startup_seconds, _started_at
+
+    with _lock:
+        if _rag_service is None:
+            start_time = time.perf_counter()
+            _rag_service = RAGService(openai_api_key=settings.OPENAI_API_KEY)
+            _job_manager = IngestJobManager(
+                _rag_service,
+                max_workers=settings.INGEST_WORKERS,
+                max_pending=settings.INGEST_MAX_PENDING,
+                history_size=settings.INGEST_JOB_HISTORY
+            )
+            _startup_seconds = time.perf_counter() - start_time
+            _started_at = time.time()
+            logger.info("Services initialized in %.2fs", _startup_seconds)
+
+    return _rag_service
+
+
+def shutdown_services() -> None:
+    """Release clients held by the shared services"""
+    global _rag_service, _job_manager
+
+    with _lock:
+        if _job_manager is not None:
+            _job_manager.shutdown()
+            _job_manager = None
+        if _rag_service is not None:
+            try:
+                _rag_service.vector_store.client.close()
+            except Exception as e:
+                logger.warning("Error closing Qdrant client: %s", e)
+            if _rag_service.vector_store.embedding_cache is not None:
+                _rag_service.vector_store.embedding_cache.close()
+            _rag_service.document_registry.close()
+            _rag_service = None
+
+
+async def ashutdown_services() -> None:
+    """Close the async clients, then release everything else"""
+    if _rag_service is not None:
+        try:
+            await _rag_service.aclose()
+        except Exception as e:
+            logger.warning("Error closing async clients: %s", e)
+    shutdown_services()
+
+
+def get_rag_service() -> RAGService:
+    """FastAPI dependency returning the shared RAG service"""
+    return init_services()
+
+
+def get_job_manager() -> IngestJobManager:
+    """FastAPI dependency returning the shared ingestion job manager"""
+    init_services()
+    return _job_manager
+
+
+def get_startup_metrics() -> Dict[str, Any]:
+    """Startup timing for the health endpoint"""
+    return {
+        "initialized": _rag_service is not None,
+        "startup_time_seconds": round(_startup_seconds, 3) if _startup_seconds is not None else None,
+        "uptime_seconds": round(time.time() - _started_at, 1) if _started_at is not None else None
+    }
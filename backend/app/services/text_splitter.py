@@ -0,0 +1,114 @@
+from bisect import bisect_left
+from typing import Any, Iterator, Optional, Tuple
+
+# Sentence endings a chunk may break after
+SENTENCE_ENDINGS = ('.', '!', '?', '\n\n')
+
+
+class TextSplitter:
+    """Single-pass splitter producing (start, end) offsets into the source text
+
+    Each window looks for its break point only in its own second half with
+    bounded str.rfind calls, and the next window starts from the previous
+    break, so splitting is linear in the text length. Chunks are only
+    materialized as slices when requested through split().
+
+    With a tokenizer, chunk_size and chunk_overlap count tokens instead of
+    characters (the tokenizer must be a fast Hugging Face tokenizer that can
+    return offset mappings).
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, tokenizer: Optional[Any] = None):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(f"chunk_overlap must be between 0 and chunk_size ({chunk_size}), got {chunk_overlap}")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.tokenizer = tokenizer
+
+    @staticmethod
+    def last_sentence_end(text: str, lo: int, hi: int) -> int:
+        """Offset just past the last sentence ending inside text[lo:hi], or -1"""
+        position = max(text.rfind(ending, lo, hi) for ending in SENTENCE_ENDINGS)
+        return position + 1 if position >= 0 else -1
+
+    def split_offsets(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of overlapping chunks, whitespace-trimmed"""
+        if self.tokenizer is not None:
+            yield from self._token_offsets(text)
+        else:
+            yield from self._char_offsets(text)
+
+    def split(self, text: str) -> Iterator[str]:
+        """Yield chunk strings"""
+        for start, end in self.split_offsets(text):
+            yield text[start:end]
+
+    def _char_offsets(self, text: str) -> Iterator[Tuple[int, int]]:
+        length = len(text)
+        if length <= self.chunk_size:
+            if text.strip():
+                yield 0, length
+            return
+
+        start = 0
+        while start < length:
+            end = min(start + self.chunk_size, length)
+
+            # Break after the last sentence ending in the window, unless it is too early
+            if end < length:
+                boundary = self.last_sentence_end(text, start + self.chunk_size // 2 + 1, end)
+                if boundary > 0:
+                    end = boundary
+
+            trimmed = _trim(text, start, end)
+            if trimmed is not None:
+                yield trimmed
+
+            if end >= length:
+                break
+            # Move start position with overlap, always making progress
+            start = max(end - self.chunk_overlap, start + 1)
+
+    def _token_offsets(self, text: str) -> Iterator[Tuple[int, int]]:
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding["offset_mapping"]
+        token_count = len(offsets)
+        if token_count == 0:
+            return
+        if token_count <= self.chunk_size:
+            trimmed = _trim(text, offsets[0][0], offsets[-1][1])
+            if trimmed is not None:
+                yield trimmed
+            return
+
+        token_ends = [end for _, end in offsets]
+        start_token = 0
+        while start_token < token_count:
+            end_token = min(start_token + self.chunk_size, token_count)
+
+            # Prefer to end on a token that closes a sentence in the second half of the window
+            if end_token < token_count:
+                window_end = token_ends[end_token - 1]
+                earliest = token_ends[start_token + self.chunk_size // 2]
+                boundary = self.last_sentence_end(text, earliest, window_end)
+                if boundary > 0:
+                    end_token = bisect_left(token_ends, boundary) + 1
+
+            trimmed = _trim(text, offsets[start_token][0], token_ends[end_token - 1])
+            if trimmed is not None:
+                yield trimmed
+
+            if end_token >= token_count:
+                break
+            start_token = max(end_token - self.chunk_overlap, start_token + 1)
+
+
+def _trim(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Shrink [start, end) to exclude surrounding whitespace; None if nothing is left"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
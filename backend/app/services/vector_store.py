@@ -1,20 +1,141 @@
+import asyncio
 import qdrant_client
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny, Range, PointIdsList, FilterSelector,
+    NamedSparseVector, SearchRequest
+)
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Callable, Iterable, Iterator, Union
 import uuid
-import json
+import time
+import logging
+
+from app.core.config import settings
+from app.services.ingest_pipeline import IngestPipeline
+from app.services.cache import TTLCache
+from app.services.embedding_cache import EmbeddingCache, content_hash
+from app.services.query_encoder import BatchingQueryEncoder
+from app.services.embedding_backends import create_embedding_backend
+from app.services.collection_profiles import (
+    get_profile, create_collection, ensure_payload_indexes, profile_mismatches, has_sparse_vectors
+)
+from app.services.hybrid_search import SPARSE_VECTOR_NAME, SparseEncoder, reciprocal_rank_fusion
+from app.models.document import SearchFilters, HybridSearch
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic chunk point IDs
+POINT_ID_NAMESPACE = uuid.UUID("5b0c3f2e-8d6a-4c1e-9f47-2a7d1e6b9c30")
+
+# Values accepted by SEARCH_MODE
+SEARCH_MODES = ("dense", "hybrid")
+
+# Payload fields set by the store rather than the document processor
+STORE_FIELDS = ('content_hash', 'ingested_at')
+
+# Left out of result metadata: content is returned once, at the top level of each result
+METADATA_EXCLUDED = ('content',) + STORE_FIELDS
+
+# Payload fields the document listing can project; metadata is rebuilt from the others
+LISTABLE_FIELDS = (
+    'content', 'metadata', 'source', 'type', 'title', 'page', 'chunk', 'rows', 'lines', 'ingested_at', 'content_hash'
+)
+
+
+def parse_point_id(value: Union[int, str]) -> Union[int, str]:
+    """A point ID as Qdrant accepts it: an unsigned 64-bit integer or a UUID string
+
+    Digit strings become integers and UUIDs are normalized to their
+    hyphenated lowercase form. Raises ValueError for anything else.
+    """
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, int):
+        if not 0 <= value < 2 ** 64:
+            raise ValueError(f"Point ID out of range: {value}")
+        return value
+    return str(uuid.UUID(value))
+
+
+def build_payload(doc: Dict[str, Any], chunk_hash: str, ingested_at: int) -> Dict[str, Any]:
+    """Point payload for a chunk: each of its fields stored once, at the top level"""
+    payload = {'source': '', 'type': '', 'title': ''}
+    payload.update((key, value) for key, value in doc.items() if value is not None)
+    payload['content_hash'] = chunk_hash
+    payload['ingested_at'] = ingested_at
+    return payload
+
+
+def payload_metadata(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The chunk's fields other than content, returned next to it in results"""
+    # Payloads written before they were slimmed nest the fields under metadata (see scripts/migrate_payloads.py)
+    fields = payload.get('metadata', payload)
+    return {key: value for key, value in fields.items() if key not in METADATA_EXCLUDED}
+
+
+def compact_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Slim an old payload that repeats the whole chunk, content included, under metadata"""
+    compact = {key: value for key, value in payload.items() if key != 'metadata'}
+    for key, value in payload.get('metadata', {}).items():
+        if value is not None:
+            compact.setdefault(key, value)
+    return compact
 
 class VectorStore:
     def __init__(self, collection_name: str = "documents"):
-        """Initialize Qdrant vector store with sentence transformers"""
-        # Initialize Qdrant client (connects to Qdrant Docker on host)
-        self.client = qdrant_client.QdrantClient(host="host.docker.internal", port=6333)
+        """Initialize Qdrant vector store and the embedding backend"""
+        # Initialize Qdrant clients (connects to Qdrant Docker on host); the async
+        # client serves search requests without blocking the event loop
+        self.client = qdrant_client.QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+        self.async_client = qdrant_client.AsyncQdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
         self.collection_name = collection_name
+        # HNSW, quantization and on-disk settings (see COLLECTION_PROFILE)
+        self.profile = get_profile(settings.COLLECTION_PROFILE, settings.COLLECTION_PROFILE_OVERRIDES)
+        self.search_params = self.profile.search_params()
         
-        # Initialize sentence transformer model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize the embedding model (PyTorch or ONNX Runtime, see EMBEDDING_BACKEND)
+        self.model_name = settings.MODEL_NAME
+        self.embedding_backend = create_embedding_backend(
+            settings.EMBEDDING_BACKEND,
+            self.model_name,
+            settings.ONNX_MODEL_DIR,
+            onnx_threads=settings.ONNX_THREADS
+        )
+        # Tokens the encoder actually sees; anything beyond is silently truncated
+        self.max_seq_length = self.embedding_backend.max_seq_length
+        self.tokenizer = self.embedding_backend.tokenizer
+        # Counting truncation costs a second tokenizer pass per ingest, so it is opt-in
+        self.report_truncation = settings.REPORT_TRUNCATION
+        self.embedding_batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.upsert_batch_size = settings.UPSERT_BATCH_SIZE
+        self.ingest_batch_size = settings.INGEST_BATCH_SIZE
+        # Concurrent search queries are encoded together, off the event loop
+        self.query_encoder = BatchingQueryEncoder(
+            self._encode_queries,
+            window_ms=settings.QUERY_BATCH_WINDOW_MS,
+            max_batch=settings.QUERY_BATCH_MAX_SIZE,
+            timeout_seconds=settings.QUERY_ENCODE_TIMEOUT_SECONDS
+        )
+        
+        # Query embedding cache and optional search result cache
+        self.query_cache = TTLCache(settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_TTL_SECONDS)
+        self.result_cache = (
+            TTLCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL_SECONDS)
+            if settings.RESULT_CACHE_ENABLED else None
+        )
+        # Persistent chunk embeddings keyed by content hash
+        self.embedding_cache = (
+            EmbeddingCache(settings.EMBEDDING_CACHE_PATH, self.embedding_backend.cache_key, settings.EMBEDDING_DIMENSION)
+            if settings.EMBEDDING_CACHE_ENABLED else None
+        )
+        # Bumped on every write so searches racing a write skip caching their results
+        self.data_version = 0
+        
+        # BM25 term vectors are only built and stored when hybrid search is configured
+        if settings.SEARCH_MODE not in SEARCH_MODES:
+            raise ValueError(f"Unknown SEARCH_MODE: {settings.SEARCH_MODE} (expected one of {', '.join(SEARCH_MODES)})")
+        self.sparse_encoder = SparseEncoder()
+        self.sparse_enabled = settings.SEARCH_MODE == "hybrid"
         
         # Create collection if it doesn't exist
         self._create_collection()
@@ -23,107 +144,581 @@ class VectorStore:
         """Create the collection with proper configuration"""
         try:
             # Try to get collection info
-            self.client.get_collection(self.collection_name)
+            info = self.client.get_collection(self.collection_name)
         except Exception as e:
             # Only create if the error is not 'already exists' or 409
             if "already exists" in str(e) or "409" in str(e):
                 # Collection already exists, do nothing
                 return
             try:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=384,  # all-MiniLM-L6-v2 embedding size
-                        distance=Distance.COSINE
-                    )
-                )
+                create_collection(self.client, self.collection_name, settings.EMBEDDING_DIMENSION, self.profile,
+                                  sparse=self.sparse_enabled)
             except Exception as ce:
                 if "already exists" in str(ce) or "409" in str(ce):
                     return
                 raise ce
+            return
+        
+        # Indexes are cheap to add in place; other settings need a rebuild
+        ensure_payload_indexes(self.client, self.collection_name)
+        if self.sparse_enabled and not has_sparse_vectors(info):
+            self.sparse_enabled = False
+            logger.warning(
+                "Collection %s has no sparse vectors, so hybrid search falls back to dense; "
+                "rebuild it with scripts/migrate_collection.py to enable it", self.collection_name
+            )
+        mismatches = profile_mismatches(info, self.profile)
+        if mismatches:
+            logger.warning(
+                "Collection %s does not match profile %s (%s); rebuild it with scripts/migrate_collection.py",
+                self.collection_name, self.profile.name,
+                ", ".join(f"{key}: {current} != {wanted}" for key, (current, wanted) in mismatches.items())
+            )
     
     def _get_embedding(self, text: str) -> List[float]:
-        """Generate embedding using sentence transformers"""
-        embedding = self.embedding_model.encode(text)
-        return embedding.tolist()
+        """Generate embedding for a single text"""
+        return self.embedding_backend.encode([text])[0].tolist()
     
-    def add_documents(self, documents: List[Dict[str, Any]]) -> None:
-        """Add documents to the vector store"""
-        if not documents:
-            return
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalize query text for cache lookups"""
+        return " ".join(query.lower().split())
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Return the (cached) float32 embedding for a search query"""
+        key = self._normalize_query(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self.query_encoder.encode(key)
+        return embedding
+    
+    def _encode_queries(self, keys: List[str]) -> np.ndarray:
+        """Encode a batch of normalized queries and cache the read-only vectors"""
+        embeddings = self.embedding_backend.encode(keys, batch_size=len(keys))
+        embeddings.flags.writeable = False
+        for key, embedding in zip(keys, embeddings):
+            self.query_cache.set(key, embedding)
+        return embeddings
+    
+    def _invalidate_caches(self) -> None:
+        """Drop cached search results after the collection changes"""
+        self.data_version += 1
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the query and result caches"""
+        return {
+            'query_embeddings': self.query_cache.stats(),
+            'search_results': self.result_cache.stats() if self.result_cache is not None else None,
+            'chunk_embeddings': self.embedding_cache.stats() if self.embedding_cache is not None else None
+        }
+    
+    def token_chunk_size(self) -> int:
+        """Largest chunk, in tokens without special tokens, that fits the model window"""
+        limit = self.max_seq_length - self.tokenizer.num_special_tokens_to_add(pair=False)
+        if settings.CHUNK_SIZE_TOKENS:
+            return min(settings.CHUNK_SIZE_TOKENS, limit)
+        return limit
+    
+    def count_truncation(self, texts: List[str]) -> tuple:
+        """Chunks longer than the model window and the total tokens cut from them"""
+        if not texts:
+            return 0, 0
+        lengths = [len(ids) for ids in self.tokenizer(texts)['input_ids']]
+        overflow = [length - self.max_seq_length for length in lengths if length > self.max_seq_length]
+        return len(overflow), sum(overflow)
+    
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for many texts, one forward pass per batch"""
+        return self.embedding_backend.encode(texts, batch_size=self.embedding_batch_size)
+    
+    def _embed_documents(self, documents: List[Dict[str, Any]], hashes: List[str]) -> tuple:
+        """Embed chunk contents, reusing cached vectors for unchanged content
+        
+        Returns the float32 matrix and the number of cache hits.
+        """
+        texts = [doc['content'] for doc in documents]
+        if self.embedding_cache is None:
+            return self._get_embeddings(texts), 0
+        
+        cached = self.embedding_cache.get_many(hashes)
+        
+        # Encode each distinct uncached text once
+        missing = {}
+        for text, key in zip(texts, hashes):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            new_vectors = self._get_embeddings(list(missing.values()))
+            self.embedding_cache.put_many(list(missing.keys()), new_vectors)
+            cached.update(zip(missing.keys(), new_vectors))
+        
+        embeddings = np.empty((len(texts), settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        for i, key in enumerate(hashes):
+            embeddings[i] = cached[key]
         
-        points = []
-        
-        for doc in documents:
-            # Generate embedding
-            embedding = self._get_embedding(doc['content'])
-            
-            # Create point
-            point = PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={
-                    'content': doc['content'],
-                    'source': doc.get('source', ''),
-                    'type': doc.get('type', ''),
-                    'title': doc.get('title', ''),
-                    'metadata': doc
-                }
+        cache_hits = sum(1 for key in hashes if key not in missing)
+        return embeddings, cache_hits
+    
+    @staticmethod
+    def point_id(doc: Dict[str, Any], chunk_hash: str) -> str:
+        """Deterministic point ID from the chunk's source, location and content"""
+        location = doc.get('page', doc.get('rows', doc.get('lines', '')))
+        key = "|".join([
+            str(doc.get('source', '')),
+            str(location),
+            str(doc.get('chunk', '')),
+            chunk_hash
+        ])
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+    
+    @staticmethod
+    def _source_filter(source: str) -> Filter:
+        return Filter(must=[FieldCondition(key='source', match=MatchValue(value=source))])
+    
+    def get_source_point_ids(self, source: str) -> Set[str]:
+        """Return the IDs of all points stored for a source file"""
+        point_ids = set()
+        source_filter = self._source_filter(source)
+        offset = None
+        
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=source_filter,
+                limit=1000,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
             )
-            points.append(point)
+            point_ids.update(str(point.id) for point in points)
+            if offset is None:
+                break
+        
+        return point_ids
+    
+    def prepare_points(self, documents: List[Dict[str, Any]], existing_ids: Set[str]) -> Dict[str, Any]:
+        """Embed stage: assign IDs, drop already-stored chunks and encode the rest
+        
+        Returns the new points ('ids', 'vectors', 'sparse_vectors', 'payloads'), the ID of every
+        input chunk under 'point_ids', and skip/cache/truncation counters.
+        """
+        hashes = [content_hash(doc['content']) for doc in documents]
+        all_ids = [self.point_id(doc, chunk_hash) for doc, chunk_hash in zip(documents, hashes)]
         
-        # Add points in batches for better performance
-        batch_size = 100
-        for i in range(0, len(points), batch_size):
-            batch = points[i:i + batch_size]
-            self.client.upsert(
+        # Keep only chunks that are not stored yet (first occurrence of each ID)
+        new_ids, new_docs, new_hashes = [], [], []
+        seen = set()
+        for point_id, doc, chunk_hash in zip(all_ids, documents, hashes):
+            if point_id not in existing_ids and point_id not in seen:
+                seen.add(point_id)
+                new_ids.append(point_id)
+                new_docs.append(doc)
+                new_hashes.append(chunk_hash)
+        
+        embeddings, cache_hits = None, 0
+        truncated_chunks, truncated_tokens = 0, 0
+        if new_docs:
+            # Encode all uncached chunks as a single float32 matrix
+            embeddings, cache_hits = self._embed_documents(new_docs, new_hashes)
+            if self.report_truncation:
+                truncated_chunks, truncated_tokens = self.count_truncation([doc['content'] for doc in new_docs])
+        
+        ingested_at = int(time.time())
+        payloads = [build_payload(doc, chunk_hash, ingested_at) for doc, chunk_hash in zip(new_docs, new_hashes)]
+        sparse_vectors = (
+            [self.sparse_encoder.encode_document(doc['content']) for doc in new_docs]
+            if self.sparse_enabled else None
+        )
+        
+        return {
+            'ids': new_ids,
+            'vectors': embeddings,
+            'sparse_vectors': sparse_vectors,
+            'payloads': payloads,
+            'point_ids': all_ids,
+            'skipped': len(documents) - len(new_docs),
+            'cache_hits': cache_hits,
+            'cache_misses': len(new_docs) - cache_hits,
+            'truncated_chunks': truncated_chunks,
+            'truncated_tokens': truncated_tokens
+        }
+    
+    def upsert_points(self, prepared: Dict[str, Any]) -> int:
+        """Upsert stage: write points from prepare_points in UPSERT_BATCH_SIZE requests"""
+        ids = prepared['ids']
+        for i in range(0, len(ids), self.upsert_batch_size):
+            end = i + self.upsert_batch_size
+            vectors = prepared['vectors'][i:end]
+            if prepared['sparse_vectors'] is not None:
+                vectors = [
+                    {'': dense.tolist(), SPARSE_VECTOR_NAME: sparse} if sparse is not None else {'': dense.tolist()}
+                    for dense, sparse in zip(vectors, prepared['sparse_vectors'][i:end])
+                ]
+            self.client.upload_collection(
                 collection_name=self.collection_name,
-                points=batch
+                vectors=vectors,
+                payload=prepared['payloads'][i:end],
+                ids=ids[i:end],
+                batch_size=self.upsert_batch_size,
+                wait=True
             )
+        if ids:
+            self._invalidate_caches()
+        return len(ids)
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
-        # Generate query embedding
-        query_embedding = self._get_embedding(query)
+    def add_documents(self, documents: List[Dict[str, Any]], existing_ids: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Add documents to the vector store and return ingest throughput stats
         
-        # Search in Qdrant
-        search_results = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            limit=n_results,
-            with_payload=True
+        Chunks whose deterministic ID is already in existing_ids are skipped
+        without being embedded. The returned stats include the ID of every
+        chunk in the input under 'point_ids'.
+        """
+        start_time = time.perf_counter()
+        prepared = self.prepare_points(documents, existing_ids or set())
+        encoded_at = time.perf_counter()
+        added = self.upsert_points(prepared)
+        finished_at = time.perf_counter()
+        
+        elapsed = finished_at - start_time
+        stats = {
+            'chunks': added,
+            'skipped': prepared['skipped'],
+            'cache_hits': prepared['cache_hits'],
+            'cache_misses': prepared['cache_misses'],
+            'truncated_chunks': prepared['truncated_chunks'],
+            'truncated_tokens': prepared['truncated_tokens'],
+            'encode_seconds': round(encoded_at - start_time, 3),
+            'upsert_seconds': round(finished_at - encoded_at, 3),
+            'chunks_per_second': round(added / elapsed, 2) if elapsed > 0 else 0.0,
+            'point_ids': prepared['point_ids']
+        }
+        logger.info(
+            "Ingested %d chunks in %.2fs (%.1f chunks/sec, %d unchanged, %d embedding cache hits)",
+            stats['chunks'], elapsed, stats['chunks_per_second'], stats['skipped'], stats['cache_hits']
         )
+        return stats
+    
+    def sync_source(self, source: str, documents: Iterable[Dict[str, Any]],
+                    progress: Optional[Callable[..., None]] = None, replace: bool = False) -> Dict[str, Any]:
+        """Make the stored chunks of a source match documents
+        
+        documents may be a generator; parsing, embedding and upserts run as
+        pipelined stages (see IngestPipeline). New or changed chunks are
+        upserted, identical ones are skipped and chunks that no longer exist
+        in the source are deleted. replace deletes the source first so every
+        chunk is re-indexed, e.g. after switching embedding backends.
+        """
+        if replace:
+            replaced = self.delete_source(source)
+            existing_ids = set()
+        else:
+            replaced = 0
+            existing_ids = self.get_source_point_ids(source)
+        
+        pipeline = IngestPipeline(
+            self,
+            batch_size=self.ingest_batch_size,
+            queue_size=settings.INGEST_QUEUE_SIZE,
+            progress=progress
+        )
+        stats = pipeline.run(documents, existing_ids)
+        
+        stale_ids = existing_ids - pipeline.seen_ids
+        self.delete_points(list(stale_ids))
+        stats['deleted'] = len(stale_ids)
+        stats['replaced'] = replaced
+        # Distinct points the source now has; processed also counts duplicate chunks
+        stats['stored'] = len(pipeline.seen_ids)
         
+        logger.info(
+            "Synced %s: %d added, %d unchanged, %d deleted (%.1f chunks/sec, bottleneck: %s)",
+            source, stats['chunks'], stats['skipped'], stats['deleted'],
+            stats['chunks_per_second'], stats['pipeline']['bottleneck']
+        )
+        if stats['truncated_chunks']:
+            logger.warning(
+                "%s: %d chunks exceed the %d-token model window, %d tokens were not embedded",
+                source, stats['truncated_chunks'], self.max_seq_length, stats['truncated_tokens']
+            )
+        return stats
+    
+    def delete_source(self, source: str) -> int:
+        """Delete every chunk of a source file in one filtered request
+        
+        Matches on the indexed source payload field, so Qdrant selects the
+        points server-side. Returns the number of points deleted.
+        """
+        source_filter = self._source_filter(source)
+        count = self.client.count(
+            collection_name=self.collection_name,
+            count_filter=source_filter,
+            exact=True
+        ).count
+        if count:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=source_filter),
+                wait=True
+            )
+            self._invalidate_caches()
+        return count
+    
+    def delete_points(self, point_ids: List[Union[int, str]]) -> int:
+        """Delete many points in a single request"""
+        if not point_ids:
+            return 0
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=PointIdsList(points=point_ids)
+        )
+        self._invalidate_caches()
+        return len(point_ids)
+    
+    @staticmethod
+    def build_filter(filters: Optional[SearchFilters]) -> Optional[Filter]:
+        """Translate search filters into a Qdrant filter over the indexed payload fields"""
+        if filters is None:
+            return None
+        conditions = []
+        if filters.document_types:
+            conditions.append(FieldCondition(key='type', match=MatchAny(any=[t.value for t in filters.document_types])))
+        if filters.sources:
+            conditions.append(FieldCondition(key='source', match=MatchAny(any=filters.sources)))
+        if filters.pages:
+            conditions.append(FieldCondition(key='page', match=MatchAny(any=filters.pages)))
+        if filters.ingested_after is not None or filters.ingested_before is not None:
+            conditions.append(FieldCondition(key='ingested_at', range=Range(
+                gte=int(filters.ingested_after.timestamp()) if filters.ingested_after is not None else None,
+                lt=int(filters.ingested_before.timestamp()) if filters.ingested_before is not None else None
+            )))
+        return Filter(must=conditions) if conditions else None
+    
+    def _search_cache_key(self, query_embedding: np.ndarray, n_results: int, filters: Optional[SearchFilters],
+                          score_threshold: Optional[float], hybrid: Optional[HybridSearch],
+                          query: str) -> Optional[tuple]:
+        """Result cache key, or None when result caching is disabled"""
+        if self.result_cache is None:
+            return None
+        filter_key = filters.model_dump_json() if filters is not None else None
+        if hybrid is None:
+            return (query_embedding.tobytes(), n_results, filter_key, score_threshold)
+        # Sparse results depend on the exact terms, not just the embedding
+        return (query_embedding.tobytes(), n_results, filter_key, score_threshold,
+                hybrid.model_dump_json(), self._normalize_query(query))
+    
+    @staticmethod
+    def _to_documents(search_results) -> List[Dict[str, Any]]:
+        """Convert Qdrant scored points to the search result format"""
         documents = []
         for result in search_results:
             documents.append({
                 'content': result.payload['content'],
-                'metadata': result.payload['metadata'],
+                'metadata': payload_metadata(result.payload),
                 'distance': result.score,
                 'id': result.id
             })
-        
         return documents
     
-    def get_all_documents(self) -> List[Dict[str, Any]]:
-        """Get all documents from the store"""
-        # Get all points from collection
-        points = self.client.scroll(
-            collection_name=self.collection_name,
-            limit=10000,  # Adjust based on your needs
+    def _search_requests(self, query: str, query_embedding: np.ndarray, n_results: int,
+                         filters: Optional[SearchFilters], score_threshold: Optional[float],
+                         hybrid: Optional[HybridSearch]) -> List[SearchRequest]:
+        """The dense search, plus a BM25 sparse search over the same filter for hybrid search
+        
+        score_threshold only applies to the dense search, whose scores are
+        cosine similarities.
+        """
+        query_filter = self.build_filter(filters)
+        limit = n_results * settings.HYBRID_CANDIDATES if hybrid is not None else n_results
+        requests = [SearchRequest(
+            vector=query_embedding.tolist(),
+            filter=query_filter,
+            limit=limit,
+            params=self.search_params,
+            score_threshold=score_threshold,
             with_payload=True
-        )[0]
+        )]
+        sparse_query = self.sparse_encoder.encode_query(query) if hybrid is not None else None
+        if sparse_query is not None:
+            requests.append(SearchRequest(
+                vector=NamedSparseVector(name=SPARSE_VECTOR_NAME, vector=sparse_query),
+                filter=query_filter,
+                limit=limit,
+                with_payload=True
+            ))
+        return requests
+    
+    def _fuse(self, results: List[list], n_results: int, hybrid: HybridSearch) -> List[Dict[str, Any]]:
+        """Merge dense and sparse results by reciprocal rank fusion
         
+        distance is the fused score; dense_score and sparse_score are the
+        original scores, None where a retriever did not return the point.
+        """
+        dense_results = results[0]
+        sparse_results = results[1] if len(results) > 1 else []
+        dense_scores = {point.id: point.score for point in dense_results}
+        sparse_scores = {point.id: point.score for point in sparse_results}
+        fused = reciprocal_rank_fusion(
+            [(hybrid.dense_weight, dense_results), (hybrid.sparse_weight, sparse_results)],
+            n_results,
+            k=settings.RRF_K
+        )
         documents = []
-        for point in points:
+        for point, score in fused:
             documents.append({
                 'content': point.payload['content'],
-                'metadata': point.payload['metadata'],
+                'metadata': payload_metadata(point.payload),
+                'distance': score,
+                'dense_score': dense_scores.get(point.id),
+                'sparse_score': sparse_scores.get(point.id),
                 'id': point.id
             })
+        return documents
+    
+    def search(self, query: str, n_results: int = 5, filters: Optional[SearchFilters] = None,
+               score_threshold: Optional[float] = None, hybrid: Optional[HybridSearch] = None) -> List[Dict[str, Any]]:
+        """Search for similar documents
+        
+        filters and score_threshold are applied by Qdrant, so excluded points
+        are never sent back. hybrid also runs a BM25 sparse search in the same
+        request and fuses both rankings; it is ignored unless SEARCH_MODE is
+        hybrid and the collection has sparse vectors.
+        """
+        if not self.sparse_enabled:
+            hybrid = None
+        
+        # Generate query embedding
+        query_embedding = self.embed_query(query)
+        
+        cache_key = self._search_cache_key(query_embedding, n_results, filters, score_threshold, hybrid, query)
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        # A write during the Qdrant call makes these results stale, so they are not cached
+        data_version = self.data_version
+        
+        # Search in Qdrant
+        results = self.client.search_batch(
+            collection_name=self.collection_name,
+            requests=self._search_requests(query, query_embedding, n_results, filters, score_threshold, hybrid)
+        )
+        documents = self._fuse(results, n_results, hybrid) if hybrid is not None else self._to_documents(results[0])
+        
+        if cache_key is not None and self.data_version == data_version:
+            self.result_cache.set(cache_key, tuple(documents))
+        
+        return documents
+    
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """embed_query for async callers; cache misses are batched on the encoder thread"""
+        key = self._normalize_query(query)
+        embedding = self.query_cache.get(key)
+        if embedding is not None:
+            return embedding
+        return await asyncio.wrap_future(self.query_encoder.submit(key))
+    
+    async def asearch(self, query: str, n_results: int = 5, filters: Optional[SearchFilters] = None,
+                      score_threshold: Optional[float] = None,
+                      hybrid: Optional[HybridSearch] = None) -> List[Dict[str, Any]]:
+        """Search without blocking the event loop"""
+        if not self.sparse_enabled:
+            hybrid = None
+        
+        query_embedding = await self.aembed_query(query)
+        
+        cache_key = self._search_cache_key(query_embedding, n_results, filters, score_threshold, hybrid, query)
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        # A write during the Qdrant call makes these results stale, so they are not cached
+        data_version = self.data_version
+        
+        results = await self.async_client.search_batch(
+            collection_name=self.collection_name,
+            requests=self._search_requests(query, query_embedding, n_results, filters, score_threshold, hybrid)
+        )
+        documents = self._fuse(results, n_results, hybrid) if hybrid is not None else self._to_documents(results[0])
+        
+        if cache_key is not None and self.data_version == data_version:
+            self.result_cache.set(cache_key, tuple(documents))
         
         return documents
     
+    async def aclose(self) -> None:
+        """Close the async Qdrant client and stop the query encoder"""
+        await self.async_client.close()
+        self.query_encoder.close()
+    
+    @staticmethod
+    def _parse_cursor(cursor: Optional[str]):
+        """Turn a listing cursor back into the point ID Qdrant resumes from"""
+        if cursor is None:
+            return None
+        try:
+            return parse_point_id(cursor)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    @staticmethod
+    def _point_to_document(point, fields: Optional[List[str]]) -> Dict[str, Any]:
+        if fields is None:
+            fields = ['content', 'metadata']
+        document = {field: point.payload[field] for field in fields if field in point.payload}
+        if 'metadata' in fields:
+            document['metadata'] = payload_metadata(point.payload)
+        document['id'] = point.id
+        return document
+    
+    def list_documents(self, limit: int = 100, cursor: Optional[str] = None,
+                       fields: Optional[List[str]] = None) -> tuple:
+        """Return one page of documents and the cursor of the next page
+        
+        fields limits the payload fields returned (None = content and
+        metadata). The cursor is Qdrant's next_page_offset, so each page costs
+        the same however deep into the collection it is; it is None on the
+        last page.
+        """
+        if fields is not None:
+            unknown = set(fields) - set(LISTABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))} (expected {', '.join(LISTABLE_FIELDS)})")
+        points, next_offset = self.client.scroll(
+            collection_name=self.collection_name,
+            limit=limit,
+            offset=self._parse_cursor(cursor),
+            # metadata is rebuilt from the whole payload
+            with_payload=True if fields is None or 'metadata' in fields else list(fields),
+            with_vectors=False
+        )
+        documents = [self._point_to_document(point, fields) for point in points]
+        return documents, str(next_offset) if next_offset is not None else None
+    
+    def iter_documents(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield every document, fetching batch_size points at a time"""
+        cursor = None
+        while True:
+            documents, cursor = self.list_documents(batch_size, cursor, fields)
+            yield from documents
+            if cursor is None:
+                break
+    
+    def get_all_documents(self) -> List[Dict[str, Any]]:
+        """Get all documents from the store"""
+        return list(self.iter_documents())
+    
+    def get_point_sources(self, point_ids: List[Union[int, str]]) -> Dict[str, str]:
+        """Source of each given point that exists, by point ID"""
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=['source'],
+            with_vectors=False
+        )
+        return {str(point.id): point.payload.get('source', '') for point in points}
+    
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document by ID"""
         try:
@@ -131,17 +726,29 @@ class VectorStore:
                 collection_name=self.collection_name,
                 points_selector=[doc_id]
             )
+            self._invalidate_caches()
             return True
         except Exception:
             return False
     
     def clear_all(self) -> None:
-        """Clear all documents from the store"""
+        """Clear all documents from the store
+        
+        Points are deleted rather than the collection, so its profile and any
+        alias created by scripts/migrate_collection.py survive.
+        """
         try:
-            self.client.delete_collection(self.collection_name)
-            self._create_collection()
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=Filter())
+            )
         except Exception:
-            pass
+            try:
+                self._create_collection()
+            except Exception:
+                pass
+        finally:
+            self._invalidate_caches()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
@@ -150,7 +757,9 @@ class VectorStore:
             return {
                 'total_points': info.points_count,
                 'vectors_count': info.vectors_count,
-                'status': info.status
+                'indexed_vectors_count': info.indexed_vectors_count,
+                'status': info.status,
+                'profile': self.profile.name
             }
         except Exception:
             return {'error': 'Could not get stats'} 
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""Compare embedding backends on throughput, query latency and recall@k.
+
+Every backend embeds the same seeded synthetic corpus of support texts.
+Recall@k is the overlap between a backend's exact top-k neighbours for each
+query and the PyTorch backend's, so 1.0 means identical retrieval. Export
+the ONNX models first (python -m scripts.export_onnx), then run from the
+backend directory:
+
+    python -m benchmarks.bench_embedding_backends --docs 2000 --queries 200 --k 10
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_backends import BACKENDS, create_embedding_backend
+
+SUBJECTS = ["password reset", "refund", "invoice", "login page", "CSV export", "mobile app", "sync", "two-factor code"]
+PROBLEMS = ["fails with an error", "times out", "shows the wrong amount", "never arrives", "is stuck loading",
+            "works only after a restart", "was charged twice", "returns a blank page"]
+CONTEXTS = ["after the latest update", "for enterprise accounts", "on Safari", "since yesterday",
+            "when using SSO", "for customers in the EU", "on the trial plan", "after changing the email address"]
+FOLLOWUPS = ["Clearing the cache did not help.", "Support escalated the ticket.", "A workaround is to retry later.",
+             "The customer attached a screenshot.", "Engineering is investigating.", "It was resolved by a rollback."]
+
+
+def make_corpus(docs: int, queries: int, seed: int = 0):
+    """Seeded support-case texts and paraphrased queries about them"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        sentences = [
+            f"The {rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} {rng.choice(CONTEXTS)}."
+            for _ in range(rng.randint(2, 6))
+        ]
+        sentences.append(rng.choice(FOLLOWUPS))
+        corpus.append(" ".join(sentences))
+    query_texts = [
+        f"Why does the {rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} {rng.choice(CONTEXTS)}?"
+        for _ in range(queries)
+    ]
+    return corpus, query_texts
+
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k document indices per query"""
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    corpus, queries = make_corpus(args.docs, args.queries)
+    print(f"Corpus: {len(corpus)} documents, {len(queries)} queries, k={args.k}")
+
+    results: Dict[str, Dict] = {}
+    for name in args.backends.split(","):
+        try:
+            backend = create_embedding_backend(name, settings.MODEL_NAME, settings.ONNX_MODEL_DIR, settings.ONNX_THREADS)
+        except Exception as e:
+            print(f"{name:>22}: skipped ({e})")
+            continue
+
+        backend.encode(corpus[:args.batch_size], batch_size=args.batch_size)  # warm-up
+
+        start = time.perf_counter()
+        doc_vectors = backend.encode(corpus, batch_size=args.batch_size)
+        throughput = len(corpus) / (time.perf_counter() - start)
+
+        latencies: List[float] = []
+        query_vectors = []
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(backend.encode([query])[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        results[name] = {
+            "throughput": throughput,
+            "p50": statistics.median(latencies),
+            "p95": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+            "neighbours": top_k(doc_vectors, np.asarray(query_vectors), args.k),
+        }
+
+    if not results:
+        return
+
+    reference_name = "sentence-transformers" if "sentence-transformers" in results else next(iter(results))
+    reference = results[reference_name]["neighbours"]
+    print(f"{'backend':>22} {'docs/sec':>10} {'p50 ms':>8} {'p95 ms':>8} {'recall@' + str(args.k):>10}")
+    for name, result in results.items():
+        recall = np.mean([
+            len(set(found) & set(expected)) / args.k
+            for found, expected in zip(result["neighbours"], reference)
+        ])
+        print(f"{name:>22} {result['throughput']:>10.1f} {result['p50']:>8.2f} {result['p95']:>8.2f} {recall:>10.3f}")
+    print(f"Recall is measured against {reference_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Load-test the search endpoint at increasing concurrency against a running API.
+
+Start the API as a single worker, optionally against the fake LLM server so
+generation latency is controlled:
+
+    python -m scripts.fake_openai_server --port 8001 --ttft-ms 400 --token-ms 10
+    OPENAI_BASE_URL=http://localhost:8001/v1 uvicorn app.main:app --port 8000 --workers 1
+
+then run from the backend directory:
+
+    python -m benchmarks.load_test_search --url http://localhost:8000 --concurrency 1,4,16,64
+
+With non-blocking endpoints, throughput should grow with concurrency until
+the LLM or Qdrant saturates, while p50 latency stays close to the
+single-request latency.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+QUERIES = [
+    "How do I reset my password?",
+    "Refund was not processed after cancellation",
+    "Login page returns an error",
+    "Export to CSV times out",
+    "Invoice shows the wrong amount",
+    "Sync stopped working after the update",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_level(client: httpx.AsyncClient, url: str, concurrency: int, total: int, use_rag: bool, top_k: int):
+    """Send total requests with at most concurrency in flight"""
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json={
+                    "query": QUERIES[i % len(QUERIES)],
+                    "top_k": top_k,
+                    "use_rag": use_rag,
+                })
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+async def main_async(args) -> None:
+    url = args.url.rstrip("/") + "/api/search"
+    levels = [int(level) for level in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        # Warm up the model, caches and connections
+        await run_level(client, url, 1, 2, args.use_rag, args.top_k)
+
+        print(f"{'concurrency':>11} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'errors':>6}")
+        for concurrency in levels:
+            total = max(args.requests, concurrency * args.rounds)
+            latencies, errors, elapsed = await run_level(client, url, concurrency, total, args.use_rag, args.top_k)
+            if not latencies:
+                print(f"{concurrency:>11} {total:>8} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {errors:>6}")
+                continue
+            print(
+                f"{concurrency:>11} {total:>8} {len(latencies) / elapsed:>8.1f} "
+                f"{statistics.median(latencies) * 1000:>8.0f} {percentile(latencies, 95) * 1000:>8.0f} "
+                f"{max(latencies) * 1000:>8.0f} {errors:>6}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Minimum requests per level")
+    parser.add_argument("--rounds", type=int, default=3, help="Requests per concurrent client per level")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--no-rag", dest="use_rag", action="store_false", help="Search only, no answer generation")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
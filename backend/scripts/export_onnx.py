@@ -0,0 +1,89 @@
+"""Export the embedding model to ONNX, plus a dynamically quantized int8 copy.
+
+Needs torch, sentence-transformers, onnx and onnxruntime. Run from the
+backend directory:
+
+    python -m scripts.export_onnx --output ./data/onnx/all-MiniLM-L6-v2
+
+then start the API with EMBEDDING_BACKEND=onnx or EMBEDDING_BACKEND=onnx-int8
+and ONNX_MODEL_DIR pointing at the output directory.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_backends import ONNX_CONFIG_FILE, ONNX_INT8_MODEL_FILE, ONNX_MODEL_FILE
+
+
+def export(model_name: str, output_dir: str, opset: int) -> None:
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    os.makedirs(output_dir, exist_ok=True)
+
+    sample = tokenizer(["An example support question"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    config = {
+        "model_name": model_name,
+        "max_seq_length": model.max_seq_length,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "normalize": any(isinstance(module, Normalize) for module in model),
+    }
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+    print(f"Exported {model_path}")
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = os.path.join(output_dir, ONNX_INT8_MODEL_FILE)
+    quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Quantized {int8_path}")
+
+    # Sanity check: both exports should reproduce the PyTorch embeddings closely
+    from app.services.embedding_backends import OnnxBackend
+
+    texts = ["How do I reset my password?", "The refund was not processed after cancellation."]
+    reference = model.encode(texts, convert_to_numpy=True)
+    for quantized in (False, True):
+        backend = OnnxBackend(model_name, output_dir, quantized=quantized)
+        embeddings = backend.encode(texts)
+        similarity = np.sum(embeddings * reference, axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(embeddings, axis=1)
+        )
+        print(f"{backend.name}: cosine similarity to PyTorch embeddings {similarity.round(4).tolist()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=settings.MODEL_NAME)
+    parser.add_argument("--output", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+    export(args.model, args.output, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Minimal OpenAI-compatible chat completions server for local testing.
+
+Answers every request with filler text after a configurable delay, so
+streaming and time-to-first-token can be measured without an API key.
+Run from the backend directory:
+
+    python -m scripts.fake_openai_server --port 8001 --ttft-ms 400 --token-ms 25
+
+then start the API with OPENAI_BASE_URL=http://localhost:8001/v1.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+config = {"ttft_ms": 400, "token_ms": 25, "tokens": 80}
+
+
+def _answer_words(messages: List[Dict[str, Any]], limit: int) -> List[str]:
+    """Deterministic answer text echoing the user's question"""
+    question = messages[-1]["content"] if messages else ""
+    if "User Question:" in question:
+        question = question.split("User Question:", 1)[1].split("\n", 1)[0].strip()
+    words = f"Based on the provided context, here is what I found about {question}.".split()
+    filler = "The documents describe the relevant steps and any known issues in detail.".split()
+    while len(words) < limit:
+        words.extend(filler)
+    return [word + " " for word in words[:limit]]
+
+
+def _chunk(completion_id: str, model: str, delta: Dict[str, Any], finish_reason=None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake-model")
+    limit = min(body.get("max_tokens") or config["tokens"], config["tokens"])
+    words = _answer_words(body.get("messages", []), limit)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    if not body.get("stream"):
+        await asyncio.sleep((config["ttft_ms"] + config["token_ms"] * len(words)) / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(words), "total_tokens": len(words)},
+        }
+
+    async def stream():
+        await asyncio.sleep(config["ttft_ms"] / 1000)
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for word in words:
+            yield _chunk(completion_id, model, {"content": word})
+            await asyncio.sleep(config["token_ms"] / 1000)
+        yield _chunk(completion_id, model, {}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=int, default=config["ttft_ms"], help="Delay before the first token")
+    parser.add_argument("--token-ms", type=int, default=config["token_ms"], help="Delay between tokens")
+    parser.add_argument("--tokens", type=int, default=config["tokens"], help="Maximum answer length in words")
+    args = parser.parse_args()
+
+    config.update(ttft_ms=args.ttft_ms, token_ms=args.token_ms, tokens=args.tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Rebuild the Qdrant collection under a different collection profile.
+
+Points are copied with their stored vectors, so nothing is re-embedded.
+With SEARCH_MODE=hybrid, points without a BM25 sparse vector get one
+computed from the payload content; otherwise sparse vectors are dropped.
+The collection name the API uses becomes an alias of the rebuilt collection, and
+later migrations switch that alias atomically. The first migration has to
+delete the original collection to free its name for the alias, so it only
+runs with --confirm; later migrations keep the previous collection unless
+--confirm is given. Pause ingestion while migrating; points written during
+the copy are not carried over. Run from the backend directory:
+
+    python -m scripts.migrate_collection --profile memory --confirm
+    python -m scripts.migrate_collection --profile high_recall --override hnsw_ef=512
+"""
+import argparse
+import json
+import shlex
+import time
+from typing import Optional
+
+import qdrant_client
+from qdrant_client.models import (
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, PointStruct
+)
+
+from app.core.config import settings
+from app.services.collection_profiles import PROFILES, create_collection, get_profile
+from app.services.hybrid_search import SPARSE_VECTOR_NAME, SparseEncoder
+
+
+def resolve_alias(client, name: str):
+    """Collection behind an alias, or None if name is not an alias"""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return None
+
+
+def point_vectors(point, encoder: Optional[SparseEncoder]) -> dict:
+    """A point's dense vector, plus its sparse vector when an encoder is given (computed if missing)"""
+    vectors = dict(point.vector) if isinstance(point.vector, dict) else {"": point.vector}
+    if encoder is None:
+        vectors.pop(SPARSE_VECTOR_NAME, None)
+    elif SPARSE_VECTOR_NAME not in vectors:
+        sparse = encoder.encode_document(point.payload.get("content", ""))
+        if sparse is not None:
+            vectors[SPARSE_VECTOR_NAME] = sparse
+    return vectors
+
+
+def copy_points(client, source: str, target: str, batch_size: int, sparse: bool) -> int:
+    """Copy every point with its vectors and payload"""
+    encoder = SparseEncoder() if sparse else None
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(id=point.id, vector=point_vectors(point, encoder), payload=point.payload)
+                    for point in points
+                ],
+                wait=True
+            )
+            copied += len(points)
+            print(f"  copied {copied} points", end="\r", flush=True)
+        if offset is None:
+            break
+    print()
+    return copied
+
+
+def parse_override(value: str):
+    key, _, raw = value.partition("=")
+    try:
+        return key, json.loads(raw)
+    except json.JSONDecodeError:
+        return key, raw
+
+
+def rest_command(method: str, path: str, body: Optional[dict] = None) -> str:
+    """curl command for the Qdrant REST API, printed for manual recovery"""
+    url = f"http://{settings.QDRANT_HOST}:{settings.QDRANT_PORT}{path}"
+    command = f"curl -X {method} {shlex.quote(url)}"
+    if body is not None:
+        command += f" -H 'Content-Type: application/json' -d {shlex.quote(json.dumps(body))}"
+    return command
+
+
+def replace_with_alias(client, collection: str, target: str) -> None:
+    """First migration: delete the collection and create an alias with its name pointing at target
+
+    The two steps cannot be done atomically, so a failure in either prints
+    the exact commands that finish or undo the migration.
+    """
+    deleted = False
+    try:
+        if not client.delete_collection(collection):
+            raise RuntimeError(f"Qdrant did not delete {collection}")
+        deleted = True
+        client.update_collection_aliases(change_aliases_operations=[
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=collection))
+        ])
+    except Exception as e:
+        if deleted:
+            print(f"Deleted {collection} but could not create the alias: {e}")
+            print(f"All points are in {target}. Create the alias to bring the API back:")
+            print("  " + rest_command("POST", "/collections/aliases", {
+                "actions": [{"create_alias": {"collection_name": target, "alias_name": collection}}]
+            }))
+        else:
+            print(f"Could not delete {collection}: {e}")
+            print(f"{collection} is unchanged. Remove the copy, or rerun once Qdrant is reachable:")
+            print("  " + rest_command("DELETE", f"/collections/{target}"))
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="documents", help="Collection or alias name used by the API")
+    parser.add_argument("--profile", required=True, choices=list(PROFILES))
+    parser.add_argument("--override", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override one profile setting, e.g. hnsw_ef=256 (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--confirm", action="store_true",
+                        help="Delete the source collection after copying (required on the first migration, which "
+                             "replaces it with an alias; otherwise the previous collection is kept)")
+    args = parser.parse_args()
+
+    profile = get_profile(args.profile, dict(parse_override(value) for value in args.override))
+    client = qdrant_client.QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+
+    current = resolve_alias(client, args.collection) or args.collection
+    if current == args.collection and not args.confirm:
+        raise SystemExit(
+            f"{args.collection} is a collection, not an alias: the first migration deletes it after copying "
+            f"so an alias can take its name. Back it up if needed and rerun with --confirm"
+        )
+    info = client.get_collection(current)
+    target = f"{args.collection}_{profile.name}_{int(time.time())}"
+    print(f"Rebuilding {args.collection} ({current}, {info.points_count} points) as {target} with profile:")
+    print(json.dumps(profile.model_dump(), indent=2))
+
+    start = time.perf_counter()
+    sparse = settings.SEARCH_MODE == "hybrid"
+    create_collection(client, target, settings.EMBEDDING_DIMENSION, profile, sparse=sparse)
+    copied = copy_points(client, current, target, args.batch_size, sparse)
+    if copied != info.points_count:
+        raise SystemExit(f"Copied {copied} points but {current} has {info.points_count}; {target} left in place")
+
+    if current == args.collection:
+        # First migration: the name is a real collection, which must go before the alias can take its name
+        replace_with_alias(client, current, target)
+        print(f"Replaced collection {current} with alias {args.collection} -> {target}")
+    else:
+        client.update_collection_aliases(change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=args.collection)),
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=args.collection))
+        ])
+        print(f"Switched alias {args.collection}: {current} -> {target}")
+        if args.confirm:
+            client.delete_collection(current)
+            print(f"Deleted {current}")
+        else:
+            print(f"Kept {current}; delete it with --confirm next time or: {rest_command('DELETE', f'/collections/{current}')}")
+
+    overrides = {key: value for key, value in profile.model_dump().items() if value != getattr(get_profile(profile.name), key)}
+    print(f"Migrated {copied} points in {time.perf_counter() - start:.1f}s. Set COLLECTION_PROFILE={profile.name}"
+          + (f" and COLLECTION_PROFILE_OVERRIDES='{json.dumps(overrides)}'" if overrides else "")
+          + " so the API searches with the new profile's parameters")
+
+
+if __name__ == "__main__":
+    main()
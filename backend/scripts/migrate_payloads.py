@@ -0,0 +1,93 @@
+"""Slim the payloads of an existing collection and report the storage saved.
+
+Points written before the compact payload schema repeat the whole chunk,
+content included, under a metadata key. This rewrites those payloads in
+place (vectors are untouched, nothing is re-embedded) and prints payload
+sizes before and after. Payload size is measured as serialized JSON, which
+tracks what Qdrant stores and what every search and scroll returns. Run
+from the backend directory:
+
+    python -m scripts.migrate_payloads --dry-run
+    python -m scripts.migrate_payloads --batch-size 512
+"""
+import argparse
+import json
+import time
+from typing import Dict
+
+import qdrant_client
+from qdrant_client.models import OverwritePayloadOperation, SetPayload
+
+from app.core.config import settings
+from app.services.vector_store import compact_payload
+
+
+def payload_bytes(payload: Dict) -> int:
+    return len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def migrate(client, collection: str, batch_size: int, dry_run: bool) -> Dict[str, int]:
+    """Rewrite legacy payloads batch by batch; returns size totals"""
+    report = {'points': 0, 'migrated': 0, 'before_bytes': 0, 'after_bytes': 0, 'content_bytes': 0}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        operations = []
+        for point in points:
+            compact = compact_payload(point.payload)
+            report['points'] += 1
+            report['before_bytes'] += payload_bytes(point.payload)
+            report['after_bytes'] += payload_bytes(compact)
+            report['content_bytes'] += len(point.payload.get('content', '').encode('utf-8'))
+            if compact != point.payload:
+                report['migrated'] += 1
+                operations.append(OverwritePayloadOperation(
+                    overwrite_payload=SetPayload(payload=compact, points=[point.id])
+                ))
+        if operations and not dry_run:
+            # One request per batch
+            client.batch_update_points(collection_name=collection, update_operations=operations, wait=True)
+        print(f"  scanned {report['points']} points", end="\r", flush=True)
+        if offset is None:
+            break
+    print()
+    return report
+
+
+def print_report(report: Dict[str, int], on_disk_payload: bool, dry_run: bool) -> None:
+    points = max(report['points'], 1)
+    saved = report['before_bytes'] - report['after_bytes']
+    print(f"{'':>16} {'total MB':>10} {'bytes/point':>12}")
+    for label, key in (("before", 'before_bytes'), ("after", 'after_bytes'), ("chunk content", 'content_bytes')):
+        print(f"{label:>16} {report[key] / 1e6:>10.2f} {report[key] / points:>12.0f}")
+    print(f"{report['migrated']} of {report['points']} points {'would be ' if dry_run else ''}rewritten; "
+          f"payloads {saved / max(report['before_bytes'], 1):.0%} smaller ({saved / 1e6:.2f} MB)")
+    print(f"Payloads are stored {'on disk' if on_disk_payload else 'in RAM'}"
+          + ("" if on_disk_payload else "; the memory and compact collection profiles move them to disk"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="documents", help="Collection or alias name used by the API")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--dry-run", action="store_true", help="Only report the sizes before and after")
+    args = parser.parse_args()
+
+    client = qdrant_client.QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+    info = client.get_collection(args.collection)
+    print(f"{'Measuring' if args.dry_run else 'Migrating'} {args.collection} ({info.points_count} points)")
+
+    start = time.perf_counter()
+    report = migrate(client, args.collection, args.batch_size, args.dry_run)
+    print_report(report, bool(info.config.params.on_disk_payload), args.dry_run)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.services import answer_cache
+from app.services.answer_cache import SemanticAnswerCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", fake)
+    return fake
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_answer_cache_hits_similar_query_over_same_sources():
+    answers = SemanticAnswerCache(4, 60, threshold=0.95, dimension=3)
+    answers.set(unit(1, 0, 0), ["p1", "p2"], {"response": "cached"})
+
+    hit = answers.get(unit(1, 0.1, 0), ["p2", "p1"])
+    assert hit["response"] == "cached" and hit["similarity"] >= 0.95
+    assert answers.get(unit(0, 1, 0), ["p1", "p2"]) is None
+
+
+def test_answer_cache_misses_when_sources_changed():
+    answers = SemanticAnswerCache(4, 60, threshold=0.95, dimension=3)
+    answers.set(unit(1, 0, 0), ["p1", "p2"], {"response": "cached"})
+
+    assert answers.get(unit(1, 0, 0), ["p1", "p3"]) is None
+    assert answers.stats()["stale"] == 1
+
+
+def test_answer_cache_evicts_lru_and_expires(clock):
+    answers = SemanticAnswerCache(2, 10, threshold=0.99, dimension=3)
+    answers.set(unit(1, 0, 0), ["a"], {"response": "a"})
+    answers.set(unit(0, 1, 0), ["b"], {"response": "b"})
+    assert answers.get(unit(1, 0, 0), ["a"]) is not None
+    answers.set(unit(0, 0, 1), ["c"], {"response": "c"})
+
+    assert answers.get(unit(0, 1, 0), ["b"]) is None
+    assert answers.get(unit(1, 0, 0), ["a"]) is not None
+
+    clock.now += 11
+    assert answers.get(unit(0, 0, 1), ["c"]) is None
+    assert len(answers) == 0
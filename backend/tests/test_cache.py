@@ -0,0 +1,47 @@
+import pytest
+
+from app.services import cache
+from app.services.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", fake)
+    return fake
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    lru = TTLCache(2, 60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    assert lru.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(clock):
+    ttl = TTLCache(10, 5)
+    ttl.set("key", "value")
+    clock.now += 4
+    assert ttl.get("key") == "value"
+    clock.now += 2
+    assert ttl.get("key") is None
+    assert len(ttl) == 0
+    assert ttl.stats()["hits"] == 1 and ttl.stats()["misses"] == 1
+
+
+def test_ttl_cache_of_size_zero_stores_nothing():
+    disabled = TTLCache(0, 60)
+    disabled.set("key", "value")
+    assert disabled.get("key") is None
@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.documents import DeleteDocumentsRequest
+from app.services.vector_store import parse_point_id
+
+POINT_UUID = "0f5e8c1a-3b2d-5e4f-9a7c-1d2e3f4a5b6c"
+
+
+def test_parse_point_id_normalizes_uuids_and_integers():
+    assert parse_point_id(POINT_UUID.upper()) == POINT_UUID
+    assert parse_point_id(POINT_UUID.replace("-", "")) == POINT_UUID
+    assert parse_point_id("42") == 42
+    assert parse_point_id(42) == 42
+    assert parse_point_id(2 ** 64 - 1) == 2 ** 64 - 1
+
+
+@pytest.mark.parametrize("value", ["", "abc", "-1", "1.5", -1, 2 ** 64, "0f5e8c1a-3b2d"])
+def test_parse_point_id_rejects_invalid_ids(value):
+    with pytest.raises(ValueError):
+        parse_point_id(value)
+
+
+def test_delete_request_parses_and_dedupes_ids():
+    request = DeleteDocumentsRequest(ids=[POINT_UUID, POINT_UUID.upper(), "7", 7])
+    assert request.ids == [POINT_UUID, 7]
+
+
+def test_delete_request_rejects_malformed_ids():
+    with pytest.raises(ValidationError, match="Invalid document ID"):
+        DeleteDocumentsRequest(ids=[POINT_UUID, "not-an-id"])
+    with pytest.raises(ValidationError):
+        DeleteDocumentsRequest(ids=[])
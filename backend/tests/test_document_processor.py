@@ -0,0 +1,74 @@
+import pandas as pd
+
+from app.core.config import settings
+from app.services.document_processor import DocumentProcessor
+from pdf_files import write_pdf
+
+
+def write_csv(path, rows, blank_rows=()):
+    lines = ["id,name"]
+    lines += ["," if i in blank_rows else f"{i},name{i}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_chunk_row_ranges_keep_their_original_numbering(tmp_path):
+    # Ranges feed the point IDs, so re-uploading an unchanged CSV must produce the same labels
+    path = tmp_path / "rows.csv"
+    write_csv(path, 45, blank_rows={3})
+    docs = DocumentProcessor().process_file(str(path), "csv", "rows.csv")
+
+    assert [doc['rows'] for doc in docs] == ["1-21", "21-41", "42-45"]
+    assert [doc['title'] for doc in docs][0] == "Chunk 1 (Rows 1-21)"
+    assert [doc['content'].count("\n") + 1 for doc in docs] == [20, 20, 4]
+    assert "name: name2\n" in docs[0]['content'] and "name3" not in docs[0]['content']
+
+
+def test_format_csv_rows_skips_empty_cells():
+    frame = pd.DataFrame({'name': ["Ada", None, None], 'role': ["engineer", "analyst", None]})
+    assert DocumentProcessor._format_csv_rows(frame).tolist() == [
+        "name: Ada | role: engineer", "role: analyst", ""
+    ]
+
+
+def test_format_csv_rows_handles_frames_without_columns():
+    assert DocumentProcessor._format_csv_rows(pd.DataFrame(index=range(2))).tolist() == ["", ""]
+
+
+def test_format_csv_rows_upcasts_numeric_rows_like_row_iteration(tmp_path):
+    # Chunk text feeds the point IDs, so numeric-only CSVs keep their original rendering
+    path = tmp_path / "prices.csv"
+    path.write_text("id,price\n0,0.5\n1,1.25\n2,\n")
+    frame = pd.read_csv(path)
+    assert DocumentProcessor._format_csv_rows(frame).tolist() == [
+        "id: 0.0 | price: 0.5", "id: 1.0 | price: 1.25", "id: 2.0"
+    ]
+
+    docs = DocumentProcessor().process_file(str(path), "csv", "prices.csv")
+    assert docs[0]['content'] == "id: 0.0 | price: 0.5\nid: 1.0 | price: 1.25\nid: 2.0"
+
+
+def test_format_csv_rows_keeps_integers_without_float_columns():
+    frame = pd.DataFrame({'a': [1, 2], 'b': [3, 4]})
+    assert DocumentProcessor._format_csv_rows(frame).tolist() == ["a: 1 | b: 3", "a: 2 | b: 4"]
+
+
+def test_parallel_pdf_extraction_matches_serial(tmp_path, monkeypatch):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [f"Page {page} covers topic {page}" for page in range(1, 19)])
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 8)
+
+    serial = DocumentProcessor(chunk_size=500, chunk_overlap=0)
+    serial.pdf_workers = 1
+    parallel = DocumentProcessor(chunk_size=500, chunk_overlap=0)
+    parallel.pdf_workers = 2
+    parallel_calls = []
+    extract = parallel._extract_pages_parallel
+    parallel._extract_pages_parallel = lambda *args: parallel_calls.append(args) or extract(*args)
+
+    expected = serial.process_file(str(path), "pdf", "manual.pdf")
+    docs = parallel.process_file(str(path), "pdf", "manual.pdf")
+
+    assert parallel_calls == [(str(path), 18)]
+    assert docs == expected
+    assert [doc['page'] for doc in docs] == list(range(1, 19))
+    assert all(doc['content'] == f"Page {doc['page']} covers topic {doc['page']}" for doc in docs)
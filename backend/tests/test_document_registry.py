@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.document_registry import DocumentRegistry, file_hash
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = DocumentRegistry(str(tmp_path / "registry.db"), "documents")
+    yield registry
+    registry.close()
+
+
+def record(registry, source, chunks, size=100):
+    registry.record_ingest(source, "txt", chunk_count=chunks, byte_size=size, content_hash=None,
+                           ingest_seconds=1.0, chunks_per_second=float(chunks))
+
+
+def test_record_ingest_replaces_and_totals(registry):
+    record(registry, "a.txt", 3)
+    record(registry, "b.txt", 2, size=50)
+    record(registry, "a.txt", 4)
+
+    assert registry.get("a.txt")['chunk_count'] == 4
+    assert registry.totals() == {'documents': 2, 'chunks': 6, 'bytes': 150}
+    assert {source['source'] for source in registry.list()} == {"a.txt", "b.txt"}
+
+
+def test_sources_without_chunks_are_removed(registry):
+    record(registry, "a.txt", 3)
+    record(registry, "b.txt", 2)
+    registry.remove_chunks({"a.txt": 1, "b.txt": 2})
+    record(registry, "c.txt", 0)
+
+    assert registry.get("a.txt")['chunk_count'] == 2
+    assert registry.get("b.txt") is None
+    assert registry.get("c.txt") is None
+
+
+def test_collections_are_kept_apart(tmp_path, registry):
+    other = DocumentRegistry(registry.db_path, "archive")
+    record(registry, "a.txt", 3)
+    record(other, "a.txt", 5)
+    other.clear()
+
+    assert other.totals()['documents'] == 0
+    assert registry.get("a.txt")['chunk_count'] == 3
+    other.close()
+
+
+def test_rebuild_counts_stored_chunks(registry):
+    record(registry, "stale.txt", 9)
+    rebuilt = registry.rebuild([
+        {'source': "a.txt", 'type': "txt", 'content': "ab", 'ingested_at': 10},
+        {'source': "a.txt", 'type': "txt", 'content': "é", 'ingested_at': 20},
+        {'source': "b.csv", 'type': "csv", 'content': "x"},
+    ])
+
+    assert rebuilt == 2
+    assert registry.get("stale.txt") is None
+    a = registry.get("a.txt")
+    assert (a['chunk_count'], a['byte_size'], a['ingested_at'], a['content_hash']) == (2, 4, 20, None)
+
+
+def test_file_hash_reads_in_blocks(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 10)
+    assert file_hash(str(path), block_size=3) == file_hash(str(path))
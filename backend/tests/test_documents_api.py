@@ -0,0 +1,45 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import documents
+from app.services.registry import get_rag_service
+
+
+class RecordingRAGService:
+    """Records which thread each blocking call runs on"""
+
+    def __init__(self):
+        self.threads = []
+
+    def _record(self):
+        self.threads.append(threading.current_thread())
+
+    def list_sources(self):
+        self._record()
+        return [{'source': "a.txt"}]
+
+    def delete_documents(self, doc_ids):
+        self._record()
+        return {'deleted': len(doc_ids), 'not_found': []}
+
+    def delete_source(self, source):
+        self._record()
+        return 2
+
+
+def test_blocking_routes_run_off_the_event_loop():
+    service = RecordingRAGService()
+    app = FastAPI()
+    app.include_router(documents.router, prefix="/api")
+    app.dependency_overrides[get_rag_service] = lambda: service
+
+    with TestClient(app) as client:
+        loop_thread = client.portal.call(threading.current_thread)
+        assert client.get("/api/sources").json()['total_sources'] == 1
+        assert client.post("/api/documents/delete", json={'ids': [1, 2]}).json()['deleted'] == 2
+        assert client.delete("/api/sources/a.txt").json()['chunks_deleted'] == 2
+
+    assert len(service.threads) == 3
+    assert loop_thread not in service.threads
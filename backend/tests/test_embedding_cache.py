@@ -0,0 +1,24 @@
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache, content_hash
+
+
+def test_entry_count_tracks_puts_without_rescanning(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path, "model-a", 2)
+    hashes = [content_hash(text) for text in ("a", "b")]
+    cache.put_many(hashes, np.eye(2, dtype=np.float32))
+    cache.put_many(hashes[:1] + [content_hash("c")], np.ones((2, 2), dtype=np.float32))
+    assert cache.stats() == {'entries': 3}
+    # Existing vectors are kept
+    assert np.array_equal(cache.get_many(hashes[:1])[hashes[0]], [1.0, 0.0])
+    cache.close()
+
+    reopened = EmbeddingCache(path, "model-a", 2)
+    assert reopened.stats() == {'entries': 3}
+    other_model = EmbeddingCache(path, "model-b", 2)
+    assert other_model.stats() == {'entries': 0}
+    other_model.close()
+    reopened.clear()
+    assert reopened.stats() == {'entries': 0}
+    reopened.close()
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.hybrid_search import SparseEncoder, reciprocal_rank_fusion
+
+
+def points(*ids):
+    return [SimpleNamespace(id=point_id) for point_id in ids]
+
+
+def test_tokenize_keeps_codes_whole_and_split():
+    terms = SparseEncoder.tokenize("The refund for ERR-4012 failed on v2.3.1")
+    assert "the" not in terms and "for" not in terms
+    assert {"err-4012", "err", "4012", "v2.3.1", "v2", "3", "1", "refund", "failed"} <= set(terms)
+
+
+def test_term_hashes_are_stable_31_bit_indices():
+    index = SparseEncoder._index("err-4012")
+    assert index == SparseEncoder._index("err-4012")
+    assert 0 <= index < 2 ** 31
+    assert index != SparseEncoder._index("err-4013")
+
+
+def test_document_vectors_are_sorted_and_saturate_term_frequency():
+    encoder = SparseEncoder()
+    vector = encoder.encode_document("refund refund refund login")
+    assert vector.indices == sorted(vector.indices)
+    weights = dict(zip(vector.indices, vector.values))
+    refund, login = weights[SparseEncoder._index("refund")], weights[SparseEncoder._index("login")]
+    assert login < refund < 3 * login
+    assert refund < encoder.k1 + 1
+
+
+def test_query_vectors_weight_each_distinct_term_once():
+    vector = SparseEncoder().encode_query("refund refund ERR-4012")
+    assert vector.indices == sorted(vector.indices)
+    assert len(vector.indices) == 4 and set(vector.values) == {1.0}
+
+
+def test_stopword_only_text_has_no_vector():
+    encoder = SparseEncoder()
+    assert encoder.encode_document("the and of") is None
+    assert encoder.encode_query("") is None
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([(1.0, points("a", "b", "c")), (1.0, points("c", "d", "a"))], limit=3)
+    assert [point.id for point, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 63)
+
+
+def test_rrf_weights_and_limit():
+    rankings = [(0.0, points("a", "b")), (2.0, points("c", "d", "e"))]
+    fused = reciprocal_rank_fusion(rankings, limit=2, k=10)
+    assert [point.id for point, _ in fused] == ["c", "d"]
+    assert [score for _, score in fused] == pytest.approx([2 / 11, 2 / 12])
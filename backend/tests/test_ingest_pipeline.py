@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from app.services.ingest_pipeline import IngestPipeline
+
+
+class FakeVectorStore:
+    """prepare_points/upsert_points keyed by chunk content"""
+
+    def __init__(self, fail_upsert=False):
+        self.fail_upsert = fail_upsert
+        self.upserted = []
+        self.threads = set()
+
+    def prepare_points(self, documents, existing_ids):
+        self.threads.add(threading.current_thread().name)
+        ids = [doc['content'] for doc in documents]
+        new = list(dict.fromkeys(point_id for point_id in ids if point_id not in existing_ids))
+        return {
+            'ids': new, 'vectors': None, 'sparse_vectors': None, 'payloads': [{}] * len(new), 'point_ids': ids,
+            'skipped': len(documents) - len(new), 'cache_hits': 0, 'cache_misses': len(new),
+            'truncated_chunks': 0, 'truncated_tokens': 0
+        }
+
+    def upsert_points(self, prepared):
+        if self.fail_upsert:
+            raise RuntimeError("qdrant unavailable")
+        self.upserted.extend(prepared['ids'])
+        return len(prepared['ids'])
+
+
+def chunks(*contents):
+    return ({'content': content} for content in contents)
+
+
+def test_pipeline_upserts_new_chunks_once_and_tracks_every_id():
+    store = FakeVectorStore()
+    pipeline = IngestPipeline(store, batch_size=2, queue_size=1)
+    stats = pipeline.run(chunks("a", "b", "a", "c", "stored", "d", "b"), existing_ids={"stored"})
+
+    assert store.upserted == ["a", "b", "c", "d"]
+    assert pipeline.seen_ids == {"a", "b", "c", "d", "stored"}
+    assert stats['processed'] == 7 and stats['chunks'] == 4 and stats['skipped'] == 3
+    assert stats['pipeline']['stages']['parse']['batches'] == 4
+    assert store.threads == {"ingest-embed"}
+
+
+def test_pipeline_reports_progress():
+    events = []
+    pipeline = IngestPipeline(FakeVectorStore(), batch_size=2, queue_size=2,
+                              progress=lambda stage, status, **counts: events.append((stage, status.value, counts)))
+    pipeline.run(chunks("a", "b", "c"), existing_ids=set())
+    assert ("upsert", "completed", {'items_done': 3, 'items_total': 3}) in events
+
+
+def test_pipeline_reraises_parser_errors():
+    def broken():
+        yield {'content': "a"}
+        raise ValueError("bad file")
+
+    with pytest.raises(ValueError, match="bad file"):
+        IngestPipeline(FakeVectorStore(), batch_size=1, queue_size=1).run(broken(), existing_ids=set())
+
+
+def test_pipeline_reraises_upsert_errors_without_hanging():
+    pipeline = IngestPipeline(FakeVectorStore(fail_upsert=True), batch_size=1, queue_size=1)
+    with pytest.raises(RuntimeError, match="qdrant unavailable"):
+        pipeline.run(chunks(*"abcdefgh"), existing_ids=set())
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from app.models.document import DocumentStatus
+from app.services.jobs import IngestJobManager, JobQueueFullError
+
+
+class BlockingRAGService:
+    """upload_document that waits until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def upload_document(self, file_path, file_type, source_name, **kwargs):
+        self.started.set()
+        assert self.release.wait(5)
+        return {"success": True, "message": "ok"}
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"upload{i}.txt"
+        path.write_text("text")
+        paths.append(path)
+    return paths
+
+
+def test_shutdown_fails_queued_jobs_and_deletes_their_files(uploads):
+    service = BlockingRAGService()
+    manager = IngestJobManager(service, max_workers=1, max_pending=4)
+    jobs = [manager.submit(str(path), "txt", path.name, 4) for path in uploads]
+    assert service.started.wait(5)
+
+    manager.shutdown()
+    queued = [manager.get(job.id) for job in jobs[1:]]
+    assert all(job.status == DocumentStatus.FAILED and job.error for job in queued)
+    assert not any(path.exists() for path in uploads[1:])
+    assert manager.stats()["active_jobs"] == 1
+
+    # The running job still finishes and cleans up
+    service.release.set()
+    wait_for(lambda: manager.get(jobs[0].id).status == DocumentStatus.COMPLETED)
+    assert not uploads[0].exists()
+    assert manager.stats()["active_jobs"] == 0
+
+
+def test_submit_after_shutdown_is_rejected(uploads):
+    manager = IngestJobManager(BlockingRAGService(), max_workers=1)
+    manager.shutdown()
+    with pytest.raises(JobQueueFullError):
+        manager.submit(str(uploads[0]), "txt", uploads[0].name, 4)
@@ -0,0 +1,34 @@
+import uuid
+
+from app.services.embedding_cache import content_hash
+from app.services.vector_store import VectorStore, build_payload, compact_payload, payload_metadata
+
+DOC = {'content': "Refunds take five days", 'source': "faq.pdf", 'type': "pdf", 'title': "Page 2 - Chunk 1",
+       'page': 2, 'chunk': 0}
+
+
+def test_payload_stores_each_field_once():
+    payload = build_payload(DOC, "abc", 1700000000)
+    assert payload == {**DOC, 'content_hash': "abc", 'ingested_at': 1700000000}
+
+
+def test_metadata_leaves_out_content_and_store_fields():
+    metadata = payload_metadata(build_payload(DOC, "abc", 1700000000))
+    assert metadata == {key: value for key, value in DOC.items() if key != 'content'}
+
+
+def test_legacy_payload_metadata_matches_compact_one():
+    legacy = {'content': DOC['content'], 'metadata': DOC}
+    assert payload_metadata(legacy) == payload_metadata(build_payload(DOC, "abc", 0))
+    assert compact_payload(legacy) == DOC
+
+
+def test_point_ids_are_deterministic_per_location_and_content():
+    point_id = VectorStore.point_id(DOC, content_hash(DOC['content']))
+    assert point_id == VectorStore.point_id(dict(DOC), content_hash(DOC['content']))
+    assert str(uuid.UUID(point_id)) == point_id
+
+    moved = {**DOC, 'page': 3}
+    edited = {**DOC, 'content': DOC['content'] + "!"}
+    assert VectorStore.point_id(moved, content_hash(DOC['content'])) != point_id
+    assert VectorStore.point_id(edited, content_hash(edited['content'])) != point_id
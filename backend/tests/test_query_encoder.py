@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from app.services.query_encoder import BatchingQueryEncoder, Histogram
+
+
+class BlockingEncoder:
+    """encode_batch that records batches and waits until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.started.set()
+        assert self.release.wait(5)
+        return [f"vec:{text}" for text in texts]
+
+
+@pytest.fixture
+def blocking():
+    encode = BlockingEncoder()
+    encoder = BatchingQueryEncoder(encode, window_ms=0, max_batch=8)
+    yield encode, encoder
+    encode.release.set()
+    encoder.close()
+
+
+def test_duplicate_texts_are_encoded_once():
+    batches = []
+
+    def encode(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+
+    encoder = BatchingQueryEncoder(encode, window_ms=50, max_batch=8)
+    futures = [encoder.submit(text) for text in ("a", "b", "a")]
+    assert [future.result(timeout=5) for future in futures] == ["A", "B", "A"]
+    assert sum(len(batch) for batch in batches) == 2
+    encoder.close()
+
+
+def test_cancelled_future_is_skipped_and_thread_survives(blocking):
+    encode, encoder = blocking
+    in_flight = encoder.submit("first")
+    assert encode.started.wait(5)
+    queued = encoder.submit("cancelled")
+    assert queued.cancel()
+    encode.release.set()
+
+    assert in_flight.result(timeout=5) == "vec:first"
+    assert encoder.encode("next") == "vec:next"
+    assert encoder._thread.is_alive()
+    assert ["cancelled"] not in encode.batches
+
+
+def test_cancelled_await_does_not_kill_encoder(blocking):
+    encode, encoder = blocking
+
+    async def cancel_waiter():
+        encoder.submit("busy")
+        assert await asyncio.to_thread(encode.started.wait, 5)
+        task = asyncio.ensure_future(asyncio.wrap_future(encoder.submit("disconnected")))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_waiter())
+    encode.release.set()
+    assert encoder.encode("after") == "vec:after"
+    assert encoder._thread.is_alive()
+
+
+def test_encode_errors_reach_the_caller():
+    def fail(texts):
+        raise RuntimeError("model unavailable")
+
+    encoder = BatchingQueryEncoder(fail, window_ms=0, max_batch=4)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        encoder.encode("query")
+    assert encoder._thread.is_alive()
+    encoder.close()
+
+
+def test_encode_times_out(blocking):
+    encode, encoder = blocking
+    encoder.timeout_seconds = 0.05
+    with pytest.raises(TimeoutError):
+        encoder.encode("slow")
+
+
+def test_histogram_buckets():
+    histogram = Histogram([1, 10])
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+    stats = histogram.as_dict()
+    assert stats['buckets'] == {'<=1': 2, '<=10': 1, '>10': 1}
+    assert stats['count'] == 4
+    assert stats['max'] == 50
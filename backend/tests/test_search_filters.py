@@ -0,0 +1,53 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from app.models.document import SearchFilters
+from app.services.document_processor import DocumentProcessor
+from app.services.embedding_cache import content_hash
+from app.services.vector_store import VectorStore, build_payload
+from pdf_files import write_pdf
+
+PAGE_TEXTS = ["Alpha invoices are due monthly", "Beta refunds take five days", "Gamma accounts renew yearly"]
+
+
+@pytest.fixture
+def pdf_collection(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, PAGE_TEXTS)
+    docs = DocumentProcessor(chunk_size=500, chunk_overlap=0).process_file(str(path), "pdf", "manual.pdf")
+
+    client = QdrantClient(":memory:")
+    client.create_collection("docs", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert("docs", points=[
+        PointStruct(
+            id=VectorStore.point_id(doc, content_hash(doc['content'])),
+            vector=[1.0, 0.0],
+            payload=build_payload(doc, content_hash(doc['content']), 0)
+        )
+        for doc in docs
+    ])
+    return client, docs
+
+
+def test_pdf_chunks_record_one_based_pages(pdf_collection):
+    _, docs = pdf_collection
+    assert [doc['page'] for doc in docs] == [1, 2, 3]
+    assert [doc['title'] for doc in docs] == [f"Page {page} - Chunk 1" for page in (1, 2, 3)]
+
+
+def test_page_filter_matches_page_numbers(pdf_collection):
+    client, _ = pdf_collection
+    points, _ = client.scroll(
+        "docs", scroll_filter=VectorStore.build_filter(SearchFilters(pages=[2, 3])), with_payload=True
+    )
+    assert sorted(point.payload['page'] for point in points) == [2, 3]
+    assert {point.payload['content'] for point in points} == set(PAGE_TEXTS[1:])
+
+
+def test_page_filter_combines_with_source(pdf_collection):
+    client, _ = pdf_collection
+    points, _ = client.scroll(
+        "docs", scroll_filter=VectorStore.build_filter(SearchFilters(pages=[1], sources=["other.pdf"]))
+    )
+    assert points == []
@@ -0,0 +1,68 @@
+import re
+
+import pytest
+
+from app.services.text_splitter import TextSplitter
+
+SENTENCES = " ".join(f"Sentence number {i} says something about topic {i % 7}." for i in range(60))
+
+
+class WhitespaceTokenizer:
+    """Fast-tokenizer stand-in: one token per whitespace-separated word"""
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [match.span() for match in re.finditer(r"\S+", text)]}
+
+
+def test_short_text_is_one_chunk():
+    splitter = TextSplitter(100, 10)
+    assert list(splitter.split("Just one sentence.")) == ["Just one sentence."]
+    assert list(splitter.split(" \n\t ")) == []
+
+
+def test_chunks_respect_size_and_break_after_sentences():
+    splitter = TextSplitter(200, 40)
+    chunks = list(splitter.split(SENTENCES))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    # Every chunk but the last ends on a sentence ending found in the second half of its window
+    assert all(chunk.endswith(".") for chunk in chunks[:-1])
+    assert chunks[-1] == SENTENCES[-len(chunks[-1]):]
+
+
+def test_offsets_overlap_and_cover_the_text():
+    splitter = TextSplitter(200, 40)
+    offsets = list(splitter.split_offsets(SENTENCES))
+    assert offsets[0][0] == 0 and offsets[-1][1] == len(SENTENCES)
+    for (start, end), (next_start, next_end) in zip(offsets, offsets[1:]):
+        assert start < next_start <= end
+        assert end - next_start <= 40
+        assert next_end > end
+
+
+def test_breaks_mid_sentence_when_no_ending_is_late_enough():
+    text = "word " * 100
+    chunks = list(TextSplitter(50, 0).split(text))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+
+
+def test_overlap_close_to_chunk_size_still_makes_progress():
+    offsets = list(TextSplitter(10, 9).split_offsets("abcdefghij" * 6))
+    starts = [start for start, _ in offsets]
+    assert starts == sorted(set(starts))
+    assert offsets[-1][1] == 60
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(10, 10), (10, 50), (0, 0), (10, -1)])
+def test_invalid_sizes_are_rejected(chunk_size, overlap):
+    with pytest.raises(ValueError):
+        TextSplitter(chunk_size, overlap)
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(8, 2), (20, 5)])
+def test_token_mode_counts_tokens(chunk_size, overlap):
+    splitter = TextSplitter(chunk_size, overlap, tokenizer=WhitespaceTokenizer())
+    chunks = list(splitter.split(SENTENCES))
+    assert all(len(chunk.split()) <= chunk_size for chunk in chunks)
+    assert chunks[0].split()[0] == "Sentence" and chunks[-1].endswith("topic 3.")
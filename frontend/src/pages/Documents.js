@@ -2,8 +2,12 @@ import React, { useState, useEffect } from 'react';
 import { FileText, Trash2, Eye, BarChart3, AlertTriangle } from 'lucide-react';
 import { documentsAPI } from '../services/api';
 
+const PAGE_SIZE = 100;
+const LIST_FIELDS = 'title,type,source';
+
 const Documents = () => {
   const [documents, setDocuments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -20,11 +24,12 @@ const Documents = () => {
     try {
       setLoading(true);
       const [documentsResponse, statsResponse] = await Promise.all([
-        documentsAPI.listDocuments(),
+        documentsAPI.listDocuments({ limit: PAGE_SIZE, fields: LIST_FIELDS }),
         documentsAPI.getStats(),
       ]);
       
       setDocuments(documentsResponse.documents || []);
+      setNextCursor(documentsResponse.next_cursor || null);
       setStats(statsResponse);
     } catch (err) {
       setError(err.message);
@@ -33,6 +38,16 @@ const Documents = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const response = await documentsAPI.listDocuments({ limit: PAGE_SIZE, fields: LIST_FIELDS, cursor: nextCursor });
+      setDocuments(prev => [...prev, ...(response.documents || [])]);
+      setNextCursor(response.next_cursor || null);
+    } catch (err) {
+      alert('Error loading documents: ' + err.message);
+    }
+  };
+
   const handleDeleteDocument = async (documentId) => {
     if (!window.confirm('Are you sure you want to delete this document?')) {
       return;
@@ -54,6 +69,7 @@ const Documents = () => {
     try {
       await documentsAPI.clearAllDocuments();
       setDocuments([]);
+      setNextCursor(null);
       setStats(prev => ({ ...prev, total_documents: 0, total_chunks: 0 }));
     } catch (err) {
       alert('Error clearing documents: ' + err.message);
@@ -224,7 +240,7 @@ const Documents = () => {
                   <div className="flex-1">
                     <div className="font-semibold">{doc.title || doc.content || 'Untitled Document'}</div>
                     <div className="text-sm text-gray-600">
-                      {(doc.document_type || (doc.metadata && doc.metadata.type)) || 'Unknown Type'}
+                      {(doc.document_type || doc.type || (doc.metadata && doc.metadata.type)) || 'Unknown Type'}
                       {' • '}
                       {doc.category || (doc.metadata && doc.metadata.category) || 'No category'}
                     </div>
@@ -255,6 +271,11 @@ const Documents = () => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <button onClick={loadMore} className="btn btn-outline w-full">
+                Load more
+              </button>
+            )}
           </div>
         )}
       </div>
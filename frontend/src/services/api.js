@@ -37,6 +37,38 @@ export const searchAPI = {
     return api.post('/search', params);
   },
 
+  searchStream: async (params, { onSources, onToken, onDone, onError } = {}) => {
+    // Server-Sent Events over a POST body, so EventSource can't be used
+    const response = await fetch(`${api.defaults.baseURL}/search/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(params),
+    });
+    if (!response.ok) {
+      throw new Error(`Search failed with status ${response.status}`);
+    }
+
+    const handlers = { sources: onSources, token: onToken, done: onDone, error: onError };
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = message.match(/^event: (.*)$/m)?.[1];
+        const data = message.match(/^data: (.*)$/m)?.[1];
+        if (event && data && handlers[event]) {
+          handlers[event](JSON.parse(data));
+        }
+      }
+    }
+  },
+
   searchGet: async (params) => {
     return api.get('/search', { params });
   },
@@ -52,16 +84,38 @@ export const searchAPI = {
 
 // Upload API
 export const uploadAPI = {
-  uploadFile: async (file) => {
+  uploadFile: async (file, { replace = false } = {}) => {
     const formData = new FormData();
     formData.append('file', file);
+    // replace re-indexes every chunk instead of only the changed ones
+    formData.append('replace', replace);
     
-    return api.post('/upload', formData, {
+    // The backend queues the file and returns a job ID right away
+    const job = await api.post('/upload', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
       timeout: 300000, // 5 minutes for large file uploads
     });
+    return uploadAPI.waitForJob(job.job_id);
+  },
+
+  getJob: async (jobId) => {
+    return api.get(`/jobs/${jobId}`);
+  },
+
+  waitForJob: async (jobId, intervalMs = 1000) => {
+    // Poll the ingestion job until it completes or fails
+    for (;;) {
+      const job = await api.get(`/jobs/${jobId}`);
+      if (job.status === 'completed') {
+        return { ...job.result, job };
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Processing failed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
   },
 
   uploadMultiple: async (files) => {
@@ -96,6 +150,18 @@ export const documentsAPI = {
     return api.delete(`/documents/${id}`);
   },
 
+  deleteDocuments: async (ids) => {
+    return api.post('/documents/delete', { ids });
+  },
+
+  listSources: async () => {
+    return api.get('/sources');
+  },
+
+  deleteSource: async (name) => {
+    return api.delete(`/sources/${encodeURIComponent(name)}`);
+  },
+
   getDocumentChunks: async (id) => {
     return api.get(`/documents/${id}/chunks`);
   },